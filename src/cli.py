@@ -11,8 +11,8 @@ from .config import (
     get_freesurfer_home,
     get_use_docker,
 )
-from .database.loader import DatabaseLoader
-from .pipeline import Pipeline
+from .database.init_db import create_schema
+from .pipeline import get_pipeline
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -37,7 +37,7 @@ def run(dicom_dir: Path, subject_id: str, database_url: str, output_dir: Path):
     """Run the full pipeline for a subject."""
     database_url = database_url or get_database_url()
 
-    pipeline = Pipeline(
+    pipeline = get_pipeline(
         database_url=database_url,
         subjects_dir=get_subjects_dir(),
         freesurfer_home=get_freesurfer_home(),
@@ -49,6 +49,8 @@ def run(dicom_dir: Path, subject_id: str, database_url: str, output_dir: Path):
     if results["status"] == "completed":
         click.echo(f"✓ Pipeline completed successfully for {subject_id}")
         click.echo(f"  Volumetric ID: {results.get('volumetric_id')}")
+    elif results["status"] == "already_completed":
+        click.echo(f"✓ {subject_id} already processed and loaded, skipped")
     else:
         click.echo(f"✗ Pipeline failed for {subject_id}")
         for error in results.get("errors", []):
@@ -61,8 +63,7 @@ def run(dicom_dir: Path, subject_id: str, database_url: str, output_dir: Path):
 def init_db(database_url: str):
     """Initialize database schema."""
     database_url = database_url or get_database_url()
-    loader = DatabaseLoader(database_url)
-    loader.create_tables()
+    create_schema(database_url)
     click.echo("✓ Database schema initialized")
 
 
@@ -1,45 +1,91 @@
 """Configuration management."""
 
+import functools
 import os
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
 
+@functools.lru_cache(maxsize=1)
+def _load_once() -> None:
+    """Load environment variables from .env file (once per process)."""
+    load_dotenv()
 
+
+@functools.lru_cache(maxsize=1)
 def get_database_url() -> str:
     """Get PostgreSQL database URL from environment variables."""
+    _load_once()
     user = os.getenv("POSTGRES_USER", "neuroimaging")
     password = os.getenv("POSTGRES_PASSWORD", "neuroimaging")
     host = os.getenv("POSTGRES_HOST", "localhost")
     port = os.getenv("POSTGRES_PORT", "5432")
     db = os.getenv("POSTGRES_DB", "neuroimaging")
 
-    return f"postgresql://{user}:{password}@{host}:{port}/{db}"
+    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
+
+
+@functools.lru_cache(maxsize=1)
+def get_db_pool_size() -> int:
+    """Get number of persistent connections kept in the database pool."""
+    _load_once()
+    return int(os.getenv("DB_POOL_SIZE", "10"))
+
 
+@functools.lru_cache(maxsize=1)
+def get_db_pool_overflow() -> int:
+    """Get number of extra connections allowed beyond the pool size."""
+    _load_once()
+    return int(os.getenv("DB_POOL_OVERFLOW", "20"))
 
+
+@functools.lru_cache(maxsize=1)
 def get_freesurfer_home() -> str:
     """Get FreeSurfer home directory."""
+    _load_once()
     return os.getenv("FREESURFER_HOME", "/opt/freesurfer")
 
 
+@functools.lru_cache(maxsize=1)
 def get_subjects_dir() -> str:
     """Get FreeSurfer subjects directory."""
+    _load_once()
     return os.getenv("SUBJECTS_DIR", "/data/freesurfer/subjects")
 
 
+@functools.lru_cache(maxsize=1)
 def get_nifti_output_dir() -> Path:
     """Get NIfTI output directory."""
+    _load_once()
     return Path(os.getenv("NIFTI_OUTPUT_DIR", "/tmp/nifti_output"))
 
 
+@functools.lru_cache(maxsize=1)
 def get_use_docker() -> bool:
     """Get whether to use Docker for FreeSurfer."""
+    _load_once()
     return os.getenv("USE_DOCKER", "true").lower() == "true"
 
 
+@functools.lru_cache(maxsize=1)
 def get_docker_image() -> str:
     """Get Docker image for FreeSurfer."""
+    _load_once()
     return os.getenv("DOCKER_IMAGE", "freesurfer/freesurfer:latest")
+
+
+def _reset_config_cache() -> None:
+    """Clear cached config values so the environment is re-read (for tests)."""
+    for getter in (
+        _load_once,
+        get_database_url,
+        get_db_pool_size,
+        get_db_pool_overflow,
+        get_freesurfer_home,
+        get_subjects_dir,
+        get_nifti_output_dir,
+        get_use_docker,
+        get_docker_image,
+    ):
+        getter.cache_clear()
@@ -3,18 +3,33 @@
 import logging
 import sys
 
-from .loader import DatabaseLoader
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from .models import Base
 from ..config import get_database_url
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def create_schema(database_url: str):
+    """Create all database tables using a one-shot, unpooled engine.
+
+    Args:
+        database_url: SQLAlchemy database URL
+    """
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        Base.metadata.create_all(engine)
+    finally:
+        engine.dispose()
+    logger.info("Database tables created")
+
+
 def main():
     """Create database tables."""
-    database_url = get_database_url()
-    loader = DatabaseLoader(database_url)
-    loader.create_tables()
+    create_schema(get_database_url())
     logger.info("Database initialization complete")
 
 
@@ -3,7 +3,16 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -32,11 +41,13 @@ class Scan(Base):
     """Scan table - tracks individual imaging sessions."""
 
     __tablename__ = "scans"
+    __table_args__ = (
+        Index("ix_scans_subject_scan_date", "subject_id", "scan_date"),
+        Index("ix_scans_status_created", "processing_status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    subject_id = Column(
-        String(100), ForeignKey("subjects.subject_id"), nullable=False, index=True
-    )
+    subject_id = Column(String(100), ForeignKey("subjects.subject_id"), nullable=False)
     scan_date = Column(DateTime, nullable=True)
     modality = Column(String(50), nullable=False, default="T1w")
     nifti_path = Column(String(500), nullable=True)
@@ -60,11 +71,13 @@ class Volumetric(Base):
     """Volumetric measurements table."""
 
     __tablename__ = "volumetrics"
+    __table_args__ = (
+        Index("ix_volumetrics_subject_scan", "subject_id", "scan_id"),
+        Index("ix_volumetrics_subject_created", "subject_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    subject_id = Column(
-        String(100), ForeignKey("subjects.subject_id"), nullable=False, index=True
-    )
+    subject_id = Column(String(100), ForeignKey("subjects.subject_id"), nullable=False)
     scan_id = Column(Integer, ForeignKey("scans.id"), nullable=True)
 
     # Subcortical volumes (mm^3)
@@ -1,18 +1,45 @@
 """Parse FreeSurfer stats files and extract volumetric metrics."""
 
 import logging
+import mmap
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List
 
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Stats files are ASCII, so patterns operate on raw bytes
+ICV_RE = re.compile(rb"Intracranial Vol\s*=\s*([\d.]+)", re.IGNORECASE)
+MEAN_THICK_RE = re.compile(rb"mean thickness\s+=\s+([\d.]+)\s+mm", re.IGNORECASE)
+TOTAL_AREA_RE = re.compile(rb"total surface area\s+=\s+([\d.]+)\s+mm\^2", re.IGNORECASE)
+GRAYVOL_RE = re.compile(
+    rb"total gray matter volume\s+=\s+([\d.]+)\s+mm\^3", re.IGNORECASE
+)
+
 
 class StatsParser:
     """Parse FreeSurfer aseg.stats and aparc.stats files."""
 
+    # aseg StructName -> metric name
+    _STRUCT_MAP = {
+        b"Left-Hippocampus": "hippocampus_left",
+        b"Right-Hippocampus": "hippocampus_right",
+        b"Left-Amygdala": "amygdala_left",
+        b"Right-Amygdala": "amygdala_right",
+    }
+
+    # aparc summary metric prefix -> pattern
+    _APARC_RES = {
+        "mean_thickness": MEAN_THICK_RE,
+        "total_area": TOTAL_AREA_RE,
+        "gray_volume": GRAYVOL_RE,
+    }
+
     def __init__(self, subjects_dir: str):
         """Initialize stats parser.
 
@@ -21,6 +48,18 @@ class StatsParser:
         """
         self.subjects_dir = Path(subjects_dir)
 
+    @staticmethod
+    @contextmanager
+    def _mapped_lines(stats_file: Path) -> Iterator[Iterator[bytes]]:
+        """Memory-map a stats file and iterate over its raw byte lines."""
+        with open(stats_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                yield iter(())
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield iter(mm.readline, b"")
+
     def parse_aseg_stats(self, subject_id: str) -> Dict[str, float]:
         """Parse aseg.stats file for subcortical volumes.
 
@@ -31,97 +70,53 @@ class StatsParser:
             Dictionary of volumetric metrics
         """
         aseg_file = self.subjects_dir / subject_id / "stats" / "aseg.stats"
-        if not aseg_file.exists():
+        metrics = {}
+        structs_found = 0
+
+        # Column positions default to the standard layout
+        # (Index SegId NVoxels Volume_mm3 StructName ...) until ColHeaders is seen
+        vol_i, name_i = 3, 4
+        min_parts = 5
+
+        # Single streaming pass: ICV comment line plus table rows. Opening
+        # directly (rather than checking exists() first) saves a stat per file
+        try:
+            with self._mapped_lines(aseg_file) as lines:
+                for line in lines:
+                    if line.startswith(b"#"):
+                        if b"ColHeaders" in line:
+                            header = line.split(b"ColHeaders", 1)[1].split()
+                            col_idx = {name: i for i, name in enumerate(header)}
+                            vol_i = col_idx.get(b"Volume_mm3", vol_i)
+                            name_i = col_idx.get(b"StructName", name_i)
+                            min_parts = max(vol_i, name_i) + 1
+                            continue
+
+                        # Format: "# Intracranial Vol = 1500000.00 mm^3"
+                        icv_match = ICV_RE.search(line)
+                        if icv_match:
+                            metrics["icv"] = float(icv_match.group(1))
+                    elif structs_found < len(self._STRUCT_MAP):
+                        parts = line.split()
+                        if len(parts) < min_parts:
+                            continue
+                        key = self._STRUCT_MAP.get(parts[name_i])
+                        if key is None or key in metrics:
+                            continue
+                        try:
+                            metrics[key] = float(parts[vol_i])
+                        except ValueError:
+                            continue
+                        structs_found += 1
+
+                    # Remaining table rows are skipped once every structure is
+                    # found; stop entirely once ICV has been seen as well
+                    if structs_found == len(self._STRUCT_MAP) and "icv" in metrics:
+                        break
+        except FileNotFoundError:
             logger.error(f"aseg.stats not found: {aseg_file}")
             return {}
 
-        metrics = {}
-        with open(aseg_file, "r") as f:
-            content = f.read()
-
-        # Extract intracranial volume (ICV)
-        # Format: "# Intracranial Vol = 1500000.00 mm^3"
-        icv_match = re.search(
-            r"Intracranial Vol\s*=\s*([\d.]+)", content, re.IGNORECASE
-        )
-        if icv_match:
-            metrics["icv"] = float(icv_match.group(1))
-
-        # Parse tab-separated table for structure volumes
-        # Format: Index SegId NVoxels Volume_mm3 StructName ...
-        lines = content.split("\n")
-        in_table = False
-        for line in lines:
-            if "ColHeaders" in line and "StructName" in line:
-                in_table = True
-                continue
-            if in_table and line.strip() and not line.startswith("#"):
-                parts = line.split()
-                if len(parts) >= 5:
-                    struct_name = parts[4]  # StructName column
-                    volume = parts[3]  # Volume_mm3 column
-                    try:
-                        vol_float = float(volume)
-                        if (
-                            "Left-Hippocampus" in struct_name
-                            or struct_name == "Left-Hippocampus"
-                        ):
-                            metrics["hippocampus_left"] = vol_float
-                        elif (
-                            "Right-Hippocampus" in struct_name
-                            or struct_name == "Right-Hippocampus"
-                        ):
-                            metrics["hippocampus_right"] = vol_float
-                        elif (
-                            "Left-Amygdala" in struct_name
-                            or struct_name == "Left-Amygdala"
-                        ):
-                            metrics["amygdala_left"] = vol_float
-                        elif (
-                            "Right-Amygdala" in struct_name
-                            or struct_name == "Right-Amygdala"
-                        ):
-                            metrics["amygdala_right"] = vol_float
-                    except (ValueError, IndexError):
-                        continue
-
-        # Fallback: try regex patterns if table parsing didn't work
-        if "hippocampus_left" not in metrics:
-            lh_hippo_match = re.search(
-                r"Left-Hippocampus[^\d]*(\d+(?:\.\d+)?)",
-                content,
-                re.IGNORECASE | re.MULTILINE,
-            )
-            if lh_hippo_match:
-                metrics["hippocampus_left"] = float(lh_hippo_match.group(1))
-
-        if "hippocampus_right" not in metrics:
-            rh_hippo_match = re.search(
-                r"Right-Hippocampus[^\d]*(\d+(?:\.\d+)?)",
-                content,
-                re.IGNORECASE | re.MULTILINE,
-            )
-            if rh_hippo_match:
-                metrics["hippocampus_right"] = float(rh_hippo_match.group(1))
-
-        if "amygdala_left" not in metrics:
-            lh_amyg_match = re.search(
-                r"Left-Amygdala[^\d]*(\d+(?:\.\d+)?)",
-                content,
-                re.IGNORECASE | re.MULTILINE,
-            )
-            if lh_amyg_match:
-                metrics["amygdala_left"] = float(lh_amyg_match.group(1))
-
-        if "amygdala_right" not in metrics:
-            rh_amyg_match = re.search(
-                r"Right-Amygdala[^\d]*(\d+(?:\.\d+)?)",
-                content,
-                re.IGNORECASE | re.MULTILINE,
-            )
-            if rh_amyg_match:
-                metrics["amygdala_right"] = float(rh_amyg_match.group(1))
-
         logger.info(f"Parsed aseg.stats for {subject_id}: {len(metrics)} metrics")
         return metrics
 
@@ -142,56 +137,76 @@ class StatsParser:
 
         for h in hemispheres:
             aparc_file = self.subjects_dir / subject_id / "stats" / f"{h}.aparc.stats"
-            if not aparc_file.exists():
+
+            remaining = dict(self._APARC_RES)
+            try:
+                with self._mapped_lines(aparc_file) as lines:
+                    for line in lines:
+                        if not line.startswith(b"#"):
+                            continue
+                        for key, pattern in remaining.items():
+                            match = pattern.search(line)
+                            if match:
+                                metrics[f"{key}_{h}"] = float(match.group(1))
+                                del remaining[key]
+                                break
+                        if not remaining:
+                            break
+            except FileNotFoundError:
                 logger.warning(f"{h}.aparc.stats not found: {aparc_file}")
-                continue
-
-            with open(aparc_file, "r") as f:
-                content = f.read()
-
-            # Extract mean thickness
-            mean_thick_match = re.search(
-                r"mean thickness\s+=\s+([\d.]+)\s+mm", content, re.IGNORECASE
-            )
-            if mean_thick_match:
-                metrics[f"mean_thickness_{h}"] = float(mean_thick_match.group(1))
-
-            # Extract total surface area
-            total_area_match = re.search(
-                r"total surface area\s+=\s+([\d.]+)\s+mm\^2", content, re.IGNORECASE
-            )
-            if total_area_match:
-                metrics[f"total_area_{h}"] = float(total_area_match.group(1))
-
-            # Extract total gray matter volume
-            grayvol_match = re.search(
-                r"total gray matter volume\s+=\s+([\d.]+)\s+mm\^3",
-                content,
-                re.IGNORECASE,
-            )
-            if grayvol_match:
-                metrics[f"gray_volume_{h}"] = float(grayvol_match.group(1))
 
         logger.info(f"Parsed aparc.stats for {subject_id}: {len(metrics)} metrics")
         return metrics
 
-    def extract_all_metrics(self, subject_id: str) -> pd.DataFrame:
-        """Extract all metrics and return as tidy DataFrame.
+    def extract_all_metrics(self, subject_id: str) -> Dict[str, Any]:
+        """Extract all metrics for a subject.
 
         Args:
             subject_id: Subject identifier
 
         Returns:
-            DataFrame with one row per subject
+            Dictionary of metrics, including ``subject_id``
         """
-        aseg_metrics = self.parse_aseg_stats(subject_id)
-        aparc_metrics = self.parse_aparc_stats(subject_id)
+        return {
+            "subject_id": subject_id,
+            **self.parse_aseg_stats(subject_id),
+            **self.parse_aparc_stats(subject_id),
+        }
 
-        # Combine all metrics
-        all_metrics = {**aseg_metrics, **aparc_metrics}
-        all_metrics["subject_id"] = subject_id
+    def extract_all_metrics_batch(
+        self, subject_ids: List[str], max_workers: int = 16
+    ) -> pd.DataFrame:
+        """Extract metrics for a cohort into a single DataFrame.
 
-        # Convert to DataFrame
-        df = pd.DataFrame([all_metrics])
+        Each subject means a few small file reads, which on NFS/Lustre are
+        dominated by per-request latency; a thread pool keeps several reads
+        in flight at once.
 
-        return df
+        Args:
+            subject_ids: Subject identifiers
+            max_workers: Maximum concurrent subjects
+
+        Returns:
+            DataFrame with one row per subject, in input order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            records = list(executor.map(self.extract_all_metrics, subject_ids))
+
+        logger.info(f"Extracted metrics for {len(records)} subjects")
+        return self.to_dataframe(records)
+
+    @staticmethod
+    def to_dataframe(metrics_list: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+        """Convert extracted metrics into a tidy DataFrame.
+
+        The frame is built once from plain records, so a cohort can be passed
+        as a generator without materializing per-subject frames, e.g.
+        ``to_dataframe(parser.extract_all_metrics(s) for s in subject_ids)``.
+
+        Args:
+            metrics_list: Metrics dictionaries from ``extract_all_metrics``
+
+        Returns:
+            DataFrame with one row per subject
+        """
+        return pd.DataFrame.from_records(metrics_list)
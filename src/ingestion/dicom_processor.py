@@ -1,9 +1,13 @@
 """DICOM ingestion, validation, and conversion to NIfTI."""
 
+import asyncio
+import itertools
 import logging
-import subprocess
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Deque, Optional, Tuple, Union
 
 import pydicom
 
@@ -30,39 +34,89 @@ class DicomProcessor:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        dicom_files = list(dicom_dir.glob("*.dcm")) + list(dicom_dir.rglob("*.dcm"))
-        if not dicom_files:
+        # Sample first few DICOM files lazily instead of listing the whole tree.
+        # Series directories are usually flat, so check the top level with
+        # scandir first and only recurse when it has no DICOM files.
+        try:
+            with os.scandir(dicom_dir) as it:
+                sample = list(
+                    itertools.islice(
+                        (
+                            Path(e.path)
+                            for e in it
+                            if e.name.endswith(".dcm") and e.is_file()
+                        ),
+                        10,
+                    )
+                )
+        except (FileNotFoundError, NotADirectoryError):
+            return False, "No DICOM files found in directory"
+        if not sample:
+            sample = list(itertools.islice(dicom_dir.rglob("*.dcm"), 10))
+        if not sample:
             return False, "No DICOM files found in directory"
 
-        # Sample first few DICOM files to check modality
-        modalities = set()
-        for dicom_file in dicom_files[:10]:  # Sample first 10
-            try:
-                ds = pydicom.dcmread(dicom_file, stop_before_pixels=True)
-                modality = getattr(ds, "Modality", None)
-                if modality:
-                    modalities.add(modality)
-                # Check for T1-weighted sequences
-                if hasattr(ds, "ScanOptions") or hasattr(ds, "SequenceName"):
-                    # Additional validation could check sequence parameters
-                    pass
-            except Exception as e:
-                logger.warning(f"Error reading {dicom_file}: {e}")
-                continue
+        # Header reads are I/O bound, so overlap them across threads
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            modalities = set(filter(None, executor.map(self._read_modality, sample)))
 
         if "MR" not in modalities:
             return False, f"Expected MR modality, found: {modalities}"
 
         logger.info(
-            f"Validated DICOM directory: {len(dicom_files)} files, modality: {modalities}"
+            f"Validated DICOM directory: sampled {len(sample)} files, "
+            f"modality: {modalities}"
         )
         return True, None
 
+    @staticmethod
+    def _read_modality(dicom_file: Union[str, Path]) -> Optional[str]:
+        """Read only the Modality tag from a DICOM file."""
+        try:
+            ds = pydicom.dcmread(
+                dicom_file, stop_before_pixels=True, specific_tags=["Modality"]
+            )
+            return getattr(ds, "Modality", None)
+        except Exception as e:
+            logger.warning(f"Error reading {dicom_file}: {e}")
+            return None
+
     def convert_to_nifti(
         self, dicom_dir: Path, output_dir: Path, subject_id: str
     ) -> Optional[Path]:
         """Convert DICOM directory to NIfTI format using dcm2niix.
 
+        Args:
+            dicom_dir: Path to DICOM directory
+            output_dir: Path to output directory for NIfTI files
+            subject_id: Subject identifier for naming
+
+        Returns:
+            Path to output NIfTI file, or None if conversion failed
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(
+                self.convert_to_nifti_async(dicom_dir, output_dir, subject_id)
+            )
+
+        # Called from inside an event loop (e.g. Jupyter): asyncio.run() is
+        # not allowed here, so block on a fresh loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(
+                asyncio.run,
+                self.convert_to_nifti_async(dicom_dir, output_dir, subject_id),
+            ).result()
+
+    async def convert_to_nifti_async(
+        self, dicom_dir: Path, output_dir: Path, subject_id: str
+    ) -> Optional[Path]:
+        """Convert DICOM directory to NIfTI without blocking the event loop.
+
+        dcm2niix output is logged line by line as it is produced, so many
+        conversions can run concurrently and report progress.
+
         Args:
             dicom_dir: Path to DICOM directory
             output_dir: Path to output directory for NIfTI files
@@ -88,26 +142,48 @@ class DicomProcessor:
             str(dicom_dir),
         ]
 
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        # Only the end of stderr is reported on failure
+        stderr_tail: Deque[str] = deque(maxlen=50)
+
+        async def log_stream(
+            stream: asyncio.StreamReader, sink: Optional[Deque[str]] = None
+        ):
+            async for raw_line in stream:
+                line = raw_line.decode("utf-8", errors="replace").rstrip()
+                if line:
+                    logger.info(f"dcm2niix: {line}")
+                    if sink is not None:
+                        sink.append(line)
+
+        assert proc.stdout is not None and proc.stderr is not None
         try:
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True, timeout=300
+            await asyncio.wait_for(
+                asyncio.gather(
+                    log_stream(proc.stdout),
+                    log_stream(proc.stderr, stderr_tail),
+                    proc.wait(),
+                ),
+                timeout=300,
             )
-            logger.info(f"dcm2niix output: {result.stdout}")
-
-            # Find the generated NIfTI file
-            nifti_file = output_dir / f"{output_filename}.nii.gz"
-            if nifti_file.exists():
-                logger.info(f"Successfully converted DICOM to: {nifti_file}")
-                return nifti_file
-            else:
-                logger.error(
-                    f"dcm2niix completed but output file not found: {nifti_file}"
-                )
-                return None
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.error("dcm2niix conversion timed out")
+            return None
 
-        except subprocess.CalledProcessError as e:
-            logger.error(f"dcm2niix failed: {e.stderr}")
+        if proc.returncode != 0:
+            stderr = "\n".join(stderr_tail)
+            logger.error(f"dcm2niix failed: {stderr}")
             return None
-        except subprocess.TimeoutExpired:
-            logger.error("dcm2niix conversion timed out")
+
+        # Find the generated NIfTI file
+        nifti_file = output_dir / f"{output_filename}.nii.gz"
+        if nifti_file.exists():
+            logger.info(f"Successfully converted DICOM to: {nifti_file}")
+            return nifti_file
+        else:
+            logger.error(f"dcm2niix completed but output file not found: {nifti_file}")
             return None
@@ -1,8 +1,12 @@
 """Main pipeline orchestration."""
 
+import asyncio
+import functools
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .database.loader import DatabaseLoader
 from .extraction.stats_parser import StatsParser
@@ -58,7 +62,7 @@ class Pipeline:
         output_dir = output_dir or Path("/tmp/nifti_output")
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        results = {
+        results: Dict[str, Any] = {
             "subject_id": subject_id,
             "status": "pending",
             "errors": [],
@@ -87,7 +91,7 @@ class Pipeline:
             nifti_file, subject_id, use_docker=self.use_docker
         )
 
-        if freesurfer_result["status"] != "completed":
+        if freesurfer_result["status"] not in ("completed", "already_completed"):
             results["status"] = "failed"
             results["errors"].append(
                 f"FreeSurfer processing failed: {freesurfer_result.get('stderr')}"
@@ -95,10 +99,26 @@ class Pipeline:
             results["freesurfer_result"] = freesurfer_result
             return results
 
+        # A rerun of a finished subject whose metrics are already loaded has
+        # nothing left to do; loading again would duplicate its rows
+        if freesurfer_result["status"] == "already_completed":
+            try:
+                loaded = self.db_loader.subjects_with_volumetrics([subject_id])
+            except Exception as e:
+                results["status"] = "failed"
+                results["errors"].append(f"Database loading failed: {e}")
+                results["freesurfer_result"] = freesurfer_result
+                return results
+            if loaded:
+                logger.info(f"Metrics for {subject_id} already loaded, skipping")
+                results["status"] = "already_completed"
+                results["freesurfer_result"] = freesurfer_result
+                return results
+
         # Step 3: Extract metrics
         logger.info(f"Step 4: Extracting metrics for {subject_id}")
         try:
-            metrics_df = self.stats_parser.extract_all_metrics(subject_id)
+            metrics = self.stats_parser.extract_all_metrics(subject_id)
         except Exception as e:
             results["status"] = "failed"
             results["errors"].append(f"Metrics extraction failed: {e}")
@@ -108,10 +128,10 @@ class Pipeline:
         logger.info(f"Step 5: Loading metrics into database for {subject_id}")
         try:
             volumetric_id = self.db_loader.load_metrics(
-                metrics_df,
+                metrics,
                 subject_id,
                 processing_status="completed",
-                processing_runtime=freesurfer_result["runtime_seconds"],
+                processing_runtime=runtime_seconds(freesurfer_result),
                 nifti_path=str(nifti_file),
                 freesurfer_output_dir=freesurfer_result["output_dir"],
             )
@@ -122,8 +142,195 @@ class Pipeline:
             return results
 
         results["status"] = "completed"
-        results["metrics"] = metrics_df.to_dict("records")[0]
+        results["metrics"] = metrics
         results["freesurfer_result"] = freesurfer_result
 
         logger.info(f"Pipeline completed successfully for {subject_id}")
         return results
+
+    async def run_many(
+        self,
+        jobs: List[Tuple[Path, str]],
+        output_dir: Optional[Path] = None,
+        max_concurrent_fs: Optional[int] = None,
+    ) -> List[dict]:
+        """Run the pipeline for many subjects concurrently.
+
+        DICOM validation runs in a process pool, dcm2niix conversions share the
+        event loop, FreeSurfer runs in threads capped by a semaphore, and all
+        metrics are loaded into the database in a single batch at the end.
+
+        Args:
+            jobs: List of (dicom_dir, subject_id) tuples
+            output_dir: Optional output directory for NIfTI files
+            max_concurrent_fs: Maximum concurrent recon-all runs
+                (defaults to the CPU count)
+
+        Returns:
+            List of per-subject result dictionaries, in job order
+        """
+        output_dir = output_dir or Path("/tmp/nifti_output")
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        loop = asyncio.get_running_loop()
+        fs_slots = asyncio.Semaphore(max_concurrent_fs or os.cpu_count() or 1)
+        records = []
+        record_results = []
+
+        async def run_one(
+            executor: ProcessPoolExecutor, dicom_dir: Path, subject_id: str
+        ) -> dict:
+            results: Dict[str, Any] = {
+                "subject_id": subject_id,
+                "status": "pending",
+                "errors": [],
+            }
+
+            # One subject's unexpected error must not abort the whole cohort
+            try:
+                return await process_one(executor, dicom_dir, subject_id, results)
+            except Exception as e:
+                logger.error(f"Pipeline failed for {subject_id}: {e}")
+                results["status"] = "failed"
+                results["errors"].append(f"Pipeline error: {e}")
+                return results
+
+        async def process_one(
+            executor: ProcessPoolExecutor,
+            dicom_dir: Path,
+            subject_id: str,
+            results: dict,
+        ) -> dict:
+            logger.info(f"Validating DICOM for {subject_id}")
+            is_valid, error_msg = await loop.run_in_executor(
+                executor, self.dicom_processor.validate_modality, dicom_dir
+            )
+            if not is_valid:
+                results["status"] = "failed"
+                results["errors"].append(f"DICOM validation failed: {error_msg}")
+                return results
+
+            logger.info(f"Converting DICOM to NIfTI for {subject_id}")
+            nifti_file = await self.dicom_processor.convert_to_nifti_async(
+                dicom_dir, output_dir, subject_id
+            )
+            if not nifti_file:
+                results["status"] = "failed"
+                results["errors"].append("DICOM to NIfTI conversion failed")
+                return results
+
+            async with fs_slots:
+                logger.info(f"Running FreeSurfer recon-all for {subject_id}")
+                freesurfer_result = await asyncio.to_thread(
+                    self.freesurfer_runner.run_recon_all,
+                    nifti_file,
+                    subject_id,
+                    use_docker=self.use_docker,
+                )
+            results["freesurfer_result"] = freesurfer_result
+
+            if freesurfer_result["status"] not in ("completed", "already_completed"):
+                results["status"] = "failed"
+                results["errors"].append(
+                    f"FreeSurfer processing failed: {freesurfer_result.get('stderr')}"
+                )
+                return results
+
+            if freesurfer_result["status"] == "already_completed":
+                loaded = await asyncio.to_thread(
+                    self.db_loader.subjects_with_volumetrics, [subject_id]
+                )
+                if loaded:
+                    logger.info(f"Metrics for {subject_id} already loaded, skipping")
+                    results["status"] = "already_completed"
+                    return results
+
+            logger.info(f"Extracting metrics for {subject_id}")
+            try:
+                metrics = await asyncio.to_thread(
+                    self.stats_parser.extract_all_metrics, subject_id
+                )
+            except Exception as e:
+                results["status"] = "failed"
+                results["errors"].append(f"Metrics extraction failed: {e}")
+                return results
+
+            results["metrics"] = metrics
+            records.append(
+                (
+                    subject_id,
+                    metrics,
+                    {
+                        "processing_status": "completed",
+                        "processing_runtime_seconds": runtime_seconds(
+                            freesurfer_result
+                        ),
+                        "nifti_path": str(nifti_file),
+                        "freesurfer_output_dir": freesurfer_result["output_dir"],
+                    },
+                )
+            )
+            record_results.append(results)
+            return results
+
+        with ProcessPoolExecutor() as executor:
+            all_results = await asyncio.gather(
+                *(run_one(executor, dicom_dir, sid) for dicom_dir, sid in jobs)
+            )
+
+        if records:
+            logger.info(f"Loading metrics for {len(records)} subjects into database")
+            try:
+                volumetric_ids = await asyncio.to_thread(
+                    self.db_loader.load_metrics_batch, records
+                )
+            except Exception as e:
+                for results in record_results:
+                    results["status"] = "failed"
+                    results["errors"].append(f"Database loading failed: {e}")
+            else:
+                for results, volumetric_id in zip(record_results, volumetric_ids):
+                    results["volumetric_id"] = volumetric_id
+                    results["status"] = "completed"
+
+        completed = sum(
+            r["status"] in ("completed", "already_completed") for r in all_results
+        )
+        logger.info(f"Pipeline completed for {completed}/{len(jobs)} subjects")
+        return list(all_results)
+
+
+def runtime_seconds(freesurfer_result: dict) -> Optional[float]:
+    """recon-all runtime to record, or None if the run was skipped."""
+    if freesurfer_result["status"] == "already_completed":
+        return None
+    return float(freesurfer_result["runtime_seconds"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_pipeline(
+    database_url: str,
+    subjects_dir: str = "/data/freesurfer/subjects",
+    freesurfer_home: str = "/opt/freesurfer",
+    use_docker: bool = True,
+) -> Pipeline:
+    """Get a shared pipeline for a configuration.
+
+    Repeated calls with the same configuration in one process reuse the same
+    pipeline, and with it the database engine and connection pool.
+
+    Args:
+        database_url: PostgreSQL connection URL
+        subjects_dir: FreeSurfer subjects directory
+        freesurfer_home: FreeSurfer installation path
+        use_docker: Whether to use Docker for FreeSurfer
+
+    Returns:
+        Pipeline instance
+    """
+    return Pipeline(
+        database_url=database_url,
+        subjects_dir=subjects_dir,
+        freesurfer_home=freesurfer_home,
+        use_docker=use_docker,
+    )
@@ -1,5 +1,5 @@
 """FreeSurfer processing module."""
 
-from .freesurfer_runner import FreeSurferRunner
+from .freesurfer_runner import BatchScheduler, FreeSurferRunner
 
-__all__ = ["FreeSurferRunner"]
+__all__ = ["BatchScheduler", "FreeSurferRunner"]
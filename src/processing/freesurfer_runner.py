@@ -1,13 +1,181 @@
 """FreeSurfer recon-all execution wrapper."""
 
+import functools
 import logging
+import os
+import platform
+import re
+import selectors
+import shlex
+import signal
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict
+from typing import IO, Any, Iterator, Optional, Dict, List, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+RECON_ALL_TIMEOUT = 36000  # 10 hours
+
+# Where recon-all writes its working subject directory inside Docker
+DOCKER_WORK_STORAGE = ("bind", "volume", "tmpfs")
+DOCKER_TMPFS_SIZE = "50g"
+
+# Docker Desktop on macOS syncs bind mounts synchronously by default; relaxed
+# consistency is safe because nothing else touches these mounts during a run.
+# Linux ignores these options, so they are only added on macOS.
+if platform.system() == "Darwin":
+    INPUT_MOUNT_OPTIONS = "ro,cached"
+    OUTPUT_MOUNT_OPTIONS = "delegated"
+else:
+    INPUT_MOUNT_OPTIONS = "ro"
+    OUTPUT_MOUNT_OPTIONS = ""
+
+
+def _bind_mount(source: Union[str, Path], target: str, options: str) -> str:
+    """Build a ``-v`` bind mount spec, omitting the options field if empty."""
+    return f"{source}:{target}:{options}" if options else f"{source}:{target}"
+
+
+def _tail(path: Path, size: int = 1000) -> Optional[str]:
+    """Read the last size bytes of a file without loading the whole file."""
+    try:
+        with open(path, "rb") as f:
+            end = os.lseek(f.fileno(), 0, os.SEEK_END)
+            os.lseek(f.fileno(), max(end - size, 0), os.SEEK_SET)
+            data = os.read(f.fileno(), size)
+    except OSError:
+        return None
+    return data.decode("utf-8", errors="replace") or None
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_dir(path: str) -> str:
+    """Resolve a directory once; a batch's inputs share a few parents."""
+    return os.path.realpath(path)
+
+
+def _failed_result(subject_id: str, error: Exception) -> Dict[str, Any]:
+    """Batch result for a subject whose recon-all could not be started."""
+    logger.error(f"Failed to start recon-all for {subject_id}: {error}")
+    return {
+        "subject_id": subject_id,
+        "status": "failed",
+        "runtime_seconds": 0.0,
+        "output_dir": None,
+        "log_file": None,
+        "stdout": None,
+        "stderr": str(error),
+    }
+
+
+def _spawn(
+    cmd: List[str], stdout: IO, env: Optional[Dict[str, str]] = None
+) -> subprocess.Popen:
+    """Start a child process with output going to stdout.
+
+    Keep the arguments plain: preexec_fn (and user/group/umask changes) force
+    CPython to fork() this whole (numpy/pandas sized) process before exec.
+    Without them _posixsubprocess launches the child with vfork().
+    """
+    return subprocess.Popen(
+        cmd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=stdout,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def _docker_cleanup(cmd: List[str]):
+    """Run a Docker cleanup command, logging rather than raising on failure."""
+    result = subprocess.run(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode != 0:
+        logger.warning(f"{' '.join(cmd)} failed: {result.stderr.strip()}")
+
+
+@functools.lru_cache(maxsize=1)
+def _check_docker_storage_driver() -> Optional[str]:
+    """Warn once if Docker uses the AUFS storage driver.
+
+    AUFS copy-on-write adds heavy write overhead, which adds up over a
+    multi-hour recon-all run.
+
+    Returns:
+        Name of the active storage driver, or None if Docker is unavailable
+    """
+    try:
+        result = subprocess.run(
+            ["docker", "info", "--format", "{{.Driver}}"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug(f"Could not detect Docker storage driver: {e}")
+        return None
+
+    driver = result.stdout.strip() or None
+    if driver == "aufs":
+        logger.warning(
+            "Docker is using the aufs storage driver, which slows recon-all "
+            'considerably; set "storage-driver": "overlay2" in '
+            "/etc/docker/daemon.json"
+        )
+    return driver
+
+
+def _wait_for_exit(proc: subprocess.Popen, timeout: float) -> bool:
+    """Block until a child process exits, without polling.
+
+    On Linux a pidfd lets the kernel wake us when the child exits. Elsewhere a
+    blocking wait is paired with a timer that kills the child on timeout.
+
+    Args:
+        proc: Child process to wait for
+        timeout: Seconds to wait before killing the child
+
+    Returns:
+        True if the child exited on its own, False if it was killed on timeout
+    """
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(proc.pid)
+        except OSError:
+            pidfd = None
+
+    if pidfd is not None:
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(pidfd, selectors.EVENT_READ)
+                exited = bool(selector.select(timeout))
+        finally:
+            os.close(pidfd)
+        if not exited:
+            proc.kill()
+        proc.wait()
+        return exited
+
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.start()
+    try:
+        proc.wait()
+    finally:
+        timer.cancel()
+    return not timed_out.is_set()
+
 
 class FreeSurferRunner:
     """Run FreeSurfer recon-all processing."""
@@ -16,23 +184,176 @@ class FreeSurferRunner:
         self,
         freesurfer_home: str = "/opt/freesurfer",
         subjects_dir: Optional[str] = None,
+        docker_work_storage: str = "volume",
+        allow_io_uring: bool = False,
     ):
         """Initialize FreeSurfer runner.
 
         Args:
             freesurfer_home: Path to FreeSurfer installation
             subjects_dir: Path to FreeSurfer subjects directory
+            docker_work_storage: Where recon-all works inside Docker: 'bind'
+                (directly in the bind-mounted subjects_dir), 'volume' (a named
+                Docker volume) or 'tmpfs' (container memory). For 'volume' and
+                'tmpfs' the finished subject is copied into subjects_dir.
+            allow_io_uring: Run containers without Docker's default seccomp
+                profile, which blocks the io_uring syscalls. This weakens the
+                container sandbox, and io_uring under seccomp filtering needs
+                libseccomp >= 2.5 on the host.
         """
+        if docker_work_storage not in DOCKER_WORK_STORAGE:
+            raise ValueError(
+                f"docker_work_storage must be one of {DOCKER_WORK_STORAGE}, "
+                f"got {docker_work_storage!r}"
+            )
         self.freesurfer_home = freesurfer_home
         self.subjects_dir = subjects_dir or f"{freesurfer_home}/subjects"
+        self.docker_work_storage = docker_work_storage
+        self.allow_io_uring = allow_io_uring
+        self._subjects_path = Path(self.subjects_dir)
+
+        # Per-subject docker run arguments that never change for this runner
+        prefix = [
+            "docker",
+            "run",
+            "--rm",
+            "-v",
+            _bind_mount(self.subjects_dir, "/output", OUTPUT_MOUNT_OPTIONS),
+        ]
+        if allow_io_uring:
+            prefix += ["--security-opt", "seccomp=unconfined"]
+        if docker_work_storage == "tmpfs":
+            prefix += ["--tmpfs", f"/work:size={DOCKER_TMPFS_SIZE}"]
+        prefix += [
+            "-e",
+            f"SUBJECTS_DIR={'/output' if docker_work_storage == 'bind' else '/work'}",
+            "-e",
+            f"FREESURFER_HOME={freesurfer_home}",
+        ]
+        self._docker_prefix = tuple(prefix)
+
+        # Native recon-all environments, keyed by OMP_NUM_THREADS
+        self._native_envs: Dict[Optional[int], Dict[str, str]] = {}
+
+        self._container_id: Optional[str] = None
+        self._container_name: Optional[str] = None
+        self._container_input_root: Optional[Path] = None
+
+    def refresh_env(self):
+        """Re-read os.environ for subsequent native recon-all runs."""
+        self._native_envs.clear()
+
+    def start_container(
+        self,
+        input_root: Path,
+        docker_image: str = "freesurfer/freesurfer:latest",
+        name: str = "fs_pool",
+    ) -> str:
+        """Start a long-lived FreeSurfer container for batch processing.
+
+        While the container is running, Docker runs of recon-all use
+        ``docker exec`` into it instead of starting a new container per
+        subject, so container startup is paid once and the page cache is
+        shared across subjects.
+
+        Args:
+            input_root: Host directory containing every input NIfTI file,
+                mounted at /input
+            docker_image: Docker image to use
+            name: Container name
+
+        Returns:
+            Container ID
+        """
+        if self._container_id is not None:
+            raise RuntimeError(f"Container {self._container_name} already running")
+
+        _check_docker_storage_driver()
+        input_root = Path(input_root).resolve()
+        cmd = [
+            "docker",
+            "run",
+            "-d",
+            "--name",
+            name,
+            "-v",
+            _bind_mount(input_root, "/input", INPUT_MOUNT_OPTIONS),
+            "-v",
+            _bind_mount(self.subjects_dir, "/output", OUTPUT_MOUNT_OPTIONS),
+        ]
+        if self.allow_io_uring:
+            cmd += ["--security-opt", "seccomp=unconfined"]
+        # One work area shared by every subject run in the container
+        if self.docker_work_storage == "volume":
+            cmd += ["--mount", f"type=volume,source=fs_work_{name},target=/work"]
+        elif self.docker_work_storage == "tmpfs":
+            cmd += ["--tmpfs", f"/work:size={DOCKER_TMPFS_SIZE}"]
+        cmd += [
+            "-e",
+            f"FREESURFER_HOME={self.freesurfer_home}",
+            docker_image,
+            "sleep",
+            "infinity",
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        self._container_id = result.stdout.strip()
+        self._container_name = name
+        self._container_input_root = input_root
+        logger.info(f"Started FreeSurfer container {name} ({self._container_id[:12]})")
+        return self._container_id
+
+    def stop_container(self):
+        """Remove the long-lived container (and its work volume) if running."""
+        if self._container_id is None:
+            return
+
+        cleanup = [["docker", "rm", "-f", self._container_id]]
+        if self.docker_work_storage == "volume":
+            cleanup.append(
+                ["docker", "volume", "rm", "-f", f"fs_work_{self._container_name}"]
+            )
+        for cmd in cleanup:
+            _docker_cleanup(cmd)
+
+        logger.info(f"Stopped FreeSurfer container {self._container_name}")
+        self._container_id = None
+        self._container_name = None
+        self._container_input_root = None
+
+    @contextmanager
+    def docker_session(
+        self,
+        input_root: Path,
+        docker_image: str = "freesurfer/freesurfer:latest",
+        name: str = "fs_pool",
+    ) -> Iterator["FreeSurferRunner"]:
+        """Run Docker recon-all calls in one long-lived container.
+
+        Example:
+            with runner.docker_session(nifti_root) as session:
+                session.run_recon_all_batch(subjects)
+
+        Args:
+            input_root: Host directory containing every input NIfTI file
+            docker_image: Docker image to use
+            name: Container name
+        """
+        self.start_container(input_root, docker_image=docker_image, name=name)
+        try:
+            yield self
+        finally:
+            self.stop_container()
 
     def run_recon_all(
         self,
-        nifti_file: Path,
+        nifti_file: Union[str, Path],
         subject_id: str,
         use_docker: bool = True,
         docker_image: str = "freesurfer/freesurfer:latest",
-    ) -> Dict[str, any]:
+        omp_num_threads: Optional[int] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
         """Run FreeSurfer recon-all on a NIfTI file.
 
         Args:
@@ -40,107 +361,312 @@ class FreeSurferRunner:
             subject_id: Subject identifier
             use_docker: Whether to run via Docker
             docker_image: Docker image to use if use_docker=True
+            omp_num_threads: Optional OpenMP thread limit for recon-all
+            force: Run even if the subject already has a recon-all.done marker
 
         Returns:
-            Dictionary with status, runtime_seconds, and output_dir
+            Dictionary with status, runtime_seconds, and output_dir. Status is
+            'already_completed' if the subject was skipped.
         """
+        if not force:
+            done = self._already_completed(subject_id)
+            if done is not None:
+                return done
+
         start_time = time.time()
 
         if use_docker:
+            _check_docker_storage_driver()
             return self._run_recon_all_docker(
-                nifti_file, subject_id, docker_image, start_time
+                nifti_file, subject_id, docker_image, start_time, omp_num_threads
             )
         else:
-            return self._run_recon_all_native(nifti_file, subject_id, start_time)
+            return self._run_recon_all_native(
+                nifti_file, subject_id, start_time, omp_num_threads
+            )
+
+    def run_recon_all_batch(
+        self,
+        subjects: List[Tuple[Union[str, Path], str]],
+        max_parallel: Optional[int] = None,
+        use_docker: bool = True,
+        docker_image: str = "freesurfer/freesurfer:latest",
+        omp_num_threads: int = 1,
+        force: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Run recon-all for many subjects as concurrent subprocesses.
+
+        recon-all is largely single-threaded per subject, so a cohort scales
+        close to linearly with the number of concurrent runs up to core count.
+        Runs are driven by a BatchScheduler woken on child exit; when that is
+        unavailable (no pidfd support outside the main thread) each run gets
+        a worker thread instead.
+
+        Args:
+            subjects: List of (nifti_file, subject_id) tuples
+            max_parallel: Maximum concurrent recon-all runs
+                (defaults to the CPU count)
+            use_docker: Whether to run via Docker
+            docker_image: Docker image to use if use_docker=True
+            omp_num_threads: OpenMP threads per recon-all run
+            force: Rerun subjects that already have a recon-all.done marker
+
+        Returns:
+            List of result dictionaries (as from run_recon_all, plus
+            subject_id), in input order
+        """
+        cpu_count = os.cpu_count() or 1
+        max_workers = max(
+            1,
+            min(
+                max_parallel or cpu_count,
+                cpu_count // max(omp_num_threads, 1),
+                len(subjects),
+            ),
+        )
+        logger.info(
+            f"Running recon-all for {len(subjects)} subjects, "
+            f"{max_workers} at a time"
+        )
+
+        if BatchScheduler.available():
+            scheduler = BatchScheduler(
+                self,
+                max_workers,
+                use_docker=use_docker,
+                docker_image=docker_image,
+                omp_num_threads=omp_num_threads,
+                force=force,
+            )
+            return scheduler.run(subjects)
+
+        def run_one(job: Tuple[Path, str]) -> Dict[str, Any]:
+            nifti_file, subject_id = job
+            # A bad input must not discard the other subjects' results
+            try:
+                result = self.run_recon_all(
+                    nifti_file,
+                    subject_id,
+                    use_docker=use_docker,
+                    docker_image=docker_image,
+                    omp_num_threads=omp_num_threads,
+                    force=force,
+                )
+            except Exception as e:
+                return _failed_result(subject_id, e)
+            return {"subject_id": subject_id, **result}
+
+        # Each worker thread just blocks on its recon-all subprocess
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run_one, subjects))
 
     def _run_recon_all_docker(
-        self, nifti_file: Path, subject_id: str, docker_image: str, start_time: float
-    ) -> Dict[str, any]:
+        self,
+        nifti_file: Union[str, Path],
+        subject_id: str,
+        docker_image: str,
+        start_time: float,
+        omp_num_threads: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """Run recon-all using Docker."""
-        nifti_file = nifti_file.resolve()
-        nifti_dir = nifti_file.parent
+        cmd, container, volume = self._docker_command(
+            nifti_file, subject_id, docker_image, omp_num_threads
+        )
+
+        logger.info(f"Running FreeSurfer recon-all for subject {subject_id}")
+        result = None
+        try:
+            result = self._execute_recon_all(cmd, subject_id, start_time)
+            return result
+        finally:
+            killed = result is None or result["status"] == "timeout"
+            self._cleanup_docker_run(container, volume, killed)
+
+    def _docker_command(
+        self,
+        nifti_file: Union[str, Path],
+        subject_id: str,
+        docker_image: str,
+        omp_num_threads: Optional[int] = None,
+    ) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """Build the Docker command for one recon-all run.
+
+        Unless docker_work_storage is 'bind', recon-all's many small-file
+        writes go to a named volume or tmpfs instead of the host bind mount,
+        and the finished subject directory is copied to /output in the same
+        container before it exits.
 
+        Inside docker_session the run is a ``docker exec`` into the running
+        container and docker_image is ignored.
+
+        Returns:
+            Tuple of (command, per-run container name, per-run Docker volume
+            to remove afterwards)
+        """
+        nifti_path = os.path.abspath(nifti_file)
+        if os.path.islink(nifti_path):
+            # e.g. DataLad/git-annex files link outside their directory, and
+            # the link would dangle inside the container's /input mount
+            nifti_path = os.path.realpath(nifti_path)
+        nifti_dir, nifti_name = os.path.split(nifti_path)
+        nifti_dir = _resolve_dir(nifti_dir)
+        if self._container_id is not None:
+            cmd = self._docker_exec_command(
+                Path(nifti_dir, nifti_name), subject_id, omp_num_threads
+            )
+            return cmd, None, None
+
+        # Named so a run whose client is killed can still be removed
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", subject_id)
+        container = f"fs_recon_{name}"
         # Mount volumes: input directory, subjects directory, FreeSurfer license
         # Assume license is at /opt/freesurfer/license.txt or set via env
         cmd = [
-            "docker",
-            "run",
-            "--rm",
+            *self._docker_prefix,
+            "--name",
+            container,
             "-v",
-            f"{nifti_dir}:/input:ro",
-            "-v",
-            f"{self.subjects_dir}:/output",
-            "-e",
-            f"SUBJECTS_DIR=/output",
-            "-e",
-            f"FREESURFER_HOME={self.freesurfer_home}",
+            _bind_mount(nifti_dir, "/input", INPUT_MOUNT_OPTIONS),
+        ]
+
+        volume = None
+        if self.docker_work_storage == "volume":
+            volume = f"fs_work_{name}"
+            cmd += ["--mount", f"type=volume,source={volume},target=/work"]
+
+        _, script = self._docker_script(subject_id, cleanup=False)
+        if omp_num_threads is not None:
+            cmd += ["-e", f"OMP_NUM_THREADS={omp_num_threads}"]
+        cmd += [
             docker_image,
+            "/bin/sh",
+            "-c",
+            script,
             "recon-all",
             "-i",
-            f"/input/{nifti_file.name}",
+            f"/input/{nifti_name}",
             "-s",
             subject_id,
             "-all",
         ]
+        return cmd, container, volume
 
+    def _docker_exec_command(
+        self,
+        nifti_file: Path,
+        subject_id: str,
+        omp_num_threads: Optional[int] = None,
+    ) -> List[str]:
+        """Build a ``docker exec`` recon-all command for the session container."""
+        assert self._container_id is not None
+        assert self._container_input_root is not None
         try:
-            logger.info(f"Running FreeSurfer recon-all for subject {subject_id}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=36000,  # 10 hours
+            input_path = nifti_file.relative_to(self._container_input_root)
+        except ValueError:
+            raise ValueError(
+                f"{nifti_file} is not under the container input root "
+                f"{self._container_input_root}"
             )
-            runtime = time.time() - start_time
 
-            output_dir = Path(self.subjects_dir) / subject_id
-            status = (
-                "completed"
-                if (output_dir / "scripts" / "recon-all.done").exists()
-                else "failed"
-            )
+        # The work area outlives this run, so clear the subject out of it
+        work_dir, script = self._docker_script(subject_id, cleanup=True)
+        cmd = ["docker", "exec", "-e", f"SUBJECTS_DIR={work_dir}"]
+        if omp_num_threads is not None:
+            cmd += ["-e", f"OMP_NUM_THREADS={omp_num_threads}"]
+        cmd += [
+            self._container_id,
+            "/bin/sh",
+            "-c",
+            script,
+            "recon-all",
+            "-i",
+            f"/input/{input_path.as_posix()}",
+            "-s",
+            subject_id,
+            "-all",
+        ]
+        return cmd
 
-            logger.info(f"FreeSurfer completed: {status}, runtime: {runtime:.1f}s")
+    @staticmethod
+    def _cleanup_docker_run(
+        container: Optional[str], volume: Optional[str], killed: bool
+    ):
+        """Remove what a per-run container leaves behind.
 
-            return {
-                "status": status,
-                "runtime_seconds": runtime,
-                "output_dir": str(output_dir),
-                "stdout": result.stdout[-1000:],  # Last 1000 chars
-                "stderr": result.stderr[-1000:] if result.stderr else None,
-            }
+        Killing the ``docker run`` client on timeout leaves the container
+        running, so it is force-removed before its work volume, which Docker
+        will not remove while still in use.
 
-        except subprocess.CalledProcessError as e:
-            runtime = time.time() - start_time
-            logger.error(f"FreeSurfer recon-all failed: {e.stderr}")
-            return {
-                "status": "failed",
-                "runtime_seconds": runtime,
-                "output_dir": None,
-                "stdout": e.stdout[-1000:] if e.stdout else None,
-                "stderr": e.stderr[-1000:] if e.stderr else None,
-            }
-        except subprocess.TimeoutExpired:
-            runtime = time.time() - start_time
-            logger.error("FreeSurfer recon-all timed out")
-            return {
-                "status": "timeout",
-                "runtime_seconds": runtime,
-                "output_dir": None,
-                "stdout": None,
-                "stderr": "Process timed out after 10 hours",
-            }
+        Args:
+            container: Per-run container name, None for ``docker exec`` runs
+            volume: Per-run Docker work volume, if one was used
+            killed: Whether the run was killed rather than exiting on its own
+        """
+        if killed and container is not None:
+            _docker_cleanup(["docker", "rm", "-f", container])
+        if volume is not None:
+            _docker_cleanup(["docker", "volume", "rm", "-f", volume])
+
+    def _docker_script(self, subject_id: str, cleanup: bool) -> Tuple[str, str]:
+        """Build the in-container shell script wrapping recon-all.
+
+        Output is redirected inside the container onto the /output bind mount
+        so the log never streams through Docker's stdio path.
+
+        Args:
+            subject_id: Subject identifier
+            cleanup: Remove the subject from the work area after copying it out
+
+        Returns:
+            Tuple of (SUBJECTS_DIR inside the container, script)
+        """
+        log = shlex.quote(f"/output/{self._log_path(subject_id).name}")
+        if self.docker_work_storage == "bind":
+            return "/output", f'exec recon-all "$@" >> {log} 2>&1'
+
+        src = shlex.quote(f"/work/{subject_id}")
+        dst = shlex.quote(f"/output/{subject_id}")
+        script = (
+            f'recon-all "$@" >> {log} 2>&1; status=$?; '
+            f"if [ -d {src} ]; then "
+            f"mkdir -p {dst} && cp -a {src}/. {dst}/ || status=1; fi; "
+        )
+        if cleanup:
+            script += f"rm -rf {src}; "
+        return "/work", script + "exit $status"
 
     def _run_recon_all_native(
-        self, nifti_file: Path, subject_id: str, start_time: float
-    ) -> Dict[str, any]:
+        self,
+        nifti_file: Union[str, Path],
+        subject_id: str,
+        start_time: float,
+        omp_num_threads: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """Run recon-all natively (requires FreeSurfer installed)."""
-        import os
+        cmd, env = self._native_command(nifti_file, subject_id, omp_num_threads)
+
+        logger.info(f"Running FreeSurfer recon-all natively for subject {subject_id}")
+        return self._execute_recon_all(cmd, subject_id, start_time, env=env)
 
-        env = os.environ.copy()
-        env["FREESURFER_HOME"] = self.freesurfer_home
-        env["SUBJECTS_DIR"] = self.subjects_dir
+    def _native_command(
+        self,
+        nifti_file: Union[str, Path],
+        subject_id: str,
+        omp_num_threads: Optional[int] = None,
+    ) -> Tuple[List[str], Dict[str, str]]:
+        """Build the native recon-all command and its environment.
+
+        The environment is copied from os.environ once and shared by every
+        run with the same thread count; call refresh_env() to pick up changes.
+        """
+        env = self._native_envs.get(omp_num_threads)
+        if env is None:
+            env = os.environ.copy()
+            env["FREESURFER_HOME"] = self.freesurfer_home
+            env["SUBJECTS_DIR"] = self.subjects_dir
+            if omp_num_threads is not None:
+                env["OMP_NUM_THREADS"] = str(omp_num_threads)
+            self._native_envs[omp_num_threads] = env
 
         cmd = [
             f"{self.freesurfer_home}/bin/recon-all",
@@ -150,47 +676,326 @@ class FreeSurferRunner:
             subject_id,
             "-all",
         ]
+        return cmd, env
 
-        try:
-            logger.info(
-                f"Running FreeSurfer recon-all natively for subject {subject_id}"
-            )
-            result = subprocess.run(
-                cmd, env=env, capture_output=True, text=True, check=True, timeout=36000
-            )
-            runtime = time.time() - start_time
+    def _already_completed(self, subject_id: str) -> Optional[Dict[str, Any]]:
+        """Result for a subject whose recon-all already finished, else None."""
+        output_dir = self._subjects_path / subject_id
+        if not (output_dir / "scripts" / "recon-all.done").exists():
+            return None
 
-            output_dir = Path(self.subjects_dir) / subject_id
-            status = (
-                "completed"
-                if (output_dir / "scripts" / "recon-all.done").exists()
-                else "failed"
-            )
+        logger.info(f"Skipping {subject_id}: recon-all already completed")
+        return {
+            "status": "already_completed",
+            "runtime_seconds": 0.0,
+            "output_dir": str(output_dir),
+            "log_file": None,
+            "stdout": None,
+            "stderr": None,
+        }
 
-            return {
-                "status": status,
-                "runtime_seconds": runtime,
-                "output_dir": str(output_dir),
-                "stdout": result.stdout[-1000:],
-                "stderr": result.stderr[-1000:] if result.stderr else None,
-            }
+    def _log_path(self, subject_id: str) -> Path:
+        """Path of the combined stdout/stderr log for a subject's run."""
+        return self._subjects_path / f"{subject_id}.recon-all.log"
+
+    def _execute_recon_all(
+        self,
+        cmd: List[str],
+        subject_id: str,
+        start_time: float,
+        env: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Run a recon-all command and summarize the outcome."""
+        proc = self._start_recon_all(cmd, subject_id, env=env)
+        exited = _wait_for_exit(proc, RECON_ALL_TIMEOUT)
+        return self._recon_all_result(proc, subject_id, start_time, exited)
+
+    def _start_recon_all(
+        self,
+        cmd: List[str],
+        subject_id: str,
+        env: Optional[Dict[str, str]] = None,
+    ) -> subprocess.Popen:
+        """Start a recon-all command with its output going to the subject log.
+
+        Output goes straight to a log file in the subjects directory rather
+        than through pipes, so memory stays flat over a 10 hour run and only
+        the tail is read back afterwards.
+        """
+        log_path = self._log_path(subject_id)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_path.unlink(missing_ok=True)
+
+        # Append mode: inside Docker the container writes to the same file
+        with open(log_path, "ab") as log_file:
+            return _spawn(cmd, log_file, env=env)
 
-        except subprocess.CalledProcessError as e:
-            runtime = time.time() - start_time
-            logger.error(f"FreeSurfer recon-all failed: {e.stderr}")
+    def _recon_all_result(
+        self,
+        proc: subprocess.Popen,
+        subject_id: str,
+        start_time: float,
+        exited: bool,
+    ) -> Dict[str, Any]:
+        """Summarize a finished (or timed out and killed) recon-all run."""
+        log_path = self._log_path(subject_id)
+        runtime = time.time() - start_time
+        log_tail = _tail(log_path)
+
+        if not exited:
+            logger.error("FreeSurfer recon-all timed out")
             return {
-                "status": "failed",
+                "status": "timeout",
                 "runtime_seconds": runtime,
                 "output_dir": None,
-                "stdout": e.stdout[-1000:] if e.stdout else None,
-                "stderr": e.stderr[-1000:] if e.stderr else None,
+                "log_file": str(log_path),
+                "stdout": log_tail,
+                "stderr": "Process timed out after 10 hours",
             }
-        except subprocess.TimeoutExpired:
-            runtime = time.time() - start_time
+
+        # recon-all -all exits 0 only on success, so the exit code decides the
+        # status without probing the (possibly remote) subjects directory
+        output_dir = self._subjects_path / subject_id
+        if proc.returncode != 0:
+            logger.error(f"FreeSurfer recon-all failed: {log_tail}")
+            if (output_dir / "scripts" / "recon-all.done").exists():
+                logger.warning(
+                    f"recon-all exited with {proc.returncode} but {output_dir} "
+                    "has a recon-all.done marker (stale, or copy-out failed)"
+                )
             return {
-                "status": "timeout",
+                "status": "failed",
                 "runtime_seconds": runtime,
                 "output_dir": None,
-                "stdout": None,
-                "stderr": "Process timed out after 10 hours",
+                "log_file": str(log_path),
+                "stdout": log_tail,
+                "stderr": log_tail,
             }
+
+        logger.info(f"FreeSurfer completed, runtime: {runtime:.1f}s")
+
+        return {
+            "status": "completed",
+            "runtime_seconds": runtime,
+            "output_dir": str(output_dir),
+            "log_file": str(log_path),
+            "stdout": log_tail,
+            "stderr": None,
+        }
+
+
+class BatchScheduler:
+    """Run many recon-all subprocesses from a single scheduling thread.
+
+    The scheduler sleeps in one select() call and is woken by the kernel
+    whenever a child exits, then starts queued subjects in the freed slots.
+    On Linux each child gets a pidfd; elsewhere SIGCHLD is delivered through
+    ``signal.set_wakeup_fd``, which requires running in the main thread.
+    """
+
+    def __init__(
+        self,
+        runner: FreeSurferRunner,
+        max_parallel: int,
+        use_docker: bool = True,
+        docker_image: str = "freesurfer/freesurfer:latest",
+        omp_num_threads: Optional[int] = None,
+        force: bool = False,
+    ):
+        """Initialize batch scheduler.
+
+        Args:
+            runner: Runner used to build and summarize recon-all commands
+            max_parallel: Maximum concurrent recon-all runs
+            use_docker: Whether to run via Docker
+            docker_image: Docker image to use if use_docker=True
+            omp_num_threads: OpenMP threads per recon-all run
+            force: Rerun subjects that already have a recon-all.done marker
+        """
+        self.runner = runner
+        self.max_parallel = max(1, max_parallel)
+        self.use_docker = use_docker
+        self.docker_image = docker_image
+        self.omp_num_threads = omp_num_threads
+        self.force = force
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _pidfd_supported() -> bool:
+        """Whether both Python and the kernel support pidfd_open."""
+        if not hasattr(os, "pidfd_open"):
+            return False
+        try:
+            os.close(os.pidfd_open(os.getpid()))
+        except OSError:
+            return False
+        return True
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether child exits can be waited on from the calling thread."""
+        return (
+            cls._pidfd_supported()
+            or threading.current_thread() is threading.main_thread()
+        )
+
+    def run(self, subjects: List[Tuple[Union[str, Path], str]]) -> List[Dict[str, Any]]:
+        """Run recon-all for every subject.
+
+        Args:
+            subjects: List of (nifti_file, subject_id) tuples
+
+        Returns:
+            List of result dictionaries (as from run_recon_all, plus
+            subject_id), in input order
+        """
+        if self.use_docker:
+            _check_docker_storage_driver()
+
+        results: Dict[int, Dict[str, Any]] = {}
+        pending = []
+        for index, (nifti_file, subject_id) in enumerate(subjects):
+            done = None if self.force else self.runner._already_completed(subject_id)
+            if done is not None:
+                results[index] = {"subject_id": subject_id, **done}
+            else:
+                pending.append((index, (nifti_file, subject_id)))
+        pending.reverse()
+        running: Dict[int, dict] = {}
+        use_pidfd = self._pidfd_supported()
+
+        with selectors.DefaultSelector() as selector:
+            restore = None if use_pidfd else self._install_sigchld_wakeup(selector)
+            try:
+                while pending or running:
+                    while pending and len(running) < self.max_parallel:
+                        index, (nifti_file, subject_id) = pending.pop()
+                        # A bad input must not take down the runs in flight
+                        try:
+                            job = self._launch(nifti_file, subject_id, use_pidfd)
+                        except Exception as e:
+                            results[index] = _failed_result(subject_id, e)
+                            continue
+                        job["index"] = index
+                        if use_pidfd:
+                            selector.register(job["pidfd"], selectors.EVENT_READ)
+                        running[job["proc"].pid] = job
+                    if not running:
+                        continue
+
+                    timeout = max(
+                        min(job["deadline"] for job in running.values()) - time.time(),
+                        0,
+                    )
+                    for key, _ in selector.select(timeout):
+                        if key.data == "sigchld":
+                            self._drain(key.fd)
+
+                    # A wakeup only says some child exited; reap each finished
+                    # child by pid so unrelated children are left alone
+                    now = time.time()
+                    for pid, job in list(running.items()):
+                        exited = job["proc"].poll() is not None
+                        if not exited and now < job["deadline"]:
+                            continue
+                        if not exited:
+                            job["proc"].kill()
+                            job["proc"].wait()
+                        del running[pid]
+                        results[job["index"]] = self._finish(job, selector, exited)
+            finally:
+                for job in running.values():
+                    job["proc"].kill()
+                    job["proc"].wait()
+                    self._finish(job, selector, exited=False)
+                if restore is not None:
+                    restore()
+
+        return [results[index] for index in range(len(subjects))]
+
+    def _launch(
+        self, nifti_file: Union[str, Path], subject_id: str, use_pidfd: bool
+    ) -> dict:
+        """Start recon-all for one subject, with a pidfd if use_pidfd."""
+        start_time = time.time()
+        env, container, volume = None, None, None
+        if self.use_docker:
+            cmd, container, volume = self.runner._docker_command(
+                nifti_file, subject_id, self.docker_image, self.omp_num_threads
+            )
+        else:
+            cmd, env = self.runner._native_command(
+                nifti_file, subject_id, self.omp_num_threads
+            )
+
+        logger.info(f"Running FreeSurfer recon-all for subject {subject_id}")
+        proc = self.runner._start_recon_all(cmd, subject_id, env=env)
+        job = {
+            "subject_id": subject_id,
+            "proc": proc,
+            "start_time": start_time,
+            "deadline": start_time + RECON_ALL_TIMEOUT,
+            "container": container,
+            "volume": volume,
+        }
+        if use_pidfd:
+            try:
+                job["pidfd"] = os.pidfd_open(proc.pid)
+            except OSError:
+                # e.g. EMFILE: this run cannot be watched, so do not keep it
+                proc.kill()
+                proc.wait()
+                self.runner._cleanup_docker_run(container, volume, killed=True)
+                raise
+        return job
+
+    def _finish(
+        self, job: dict, selector: selectors.BaseSelector, exited: bool
+    ) -> Dict[str, Any]:
+        """Release a finished job's resources and summarize its run."""
+        pidfd = job.get("pidfd")
+        if pidfd is not None:
+            selector.unregister(pidfd)
+            os.close(pidfd)
+        try:
+            result = self.runner._recon_all_result(
+                job["proc"], job["subject_id"], job["start_time"], exited
+            )
+        finally:
+            self.runner._cleanup_docker_run(
+                job["container"], job["volume"], killed=not exited
+            )
+        return {"subject_id": job["subject_id"], **result}
+
+    @staticmethod
+    def _install_sigchld_wakeup(selector: selectors.BaseSelector):
+        """Route SIGCHLD to a pipe registered with the selector.
+
+        Returns:
+            Callable restoring the previous handler and wakeup fd
+        """
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        # A Python-level handler is needed for the C handler to write the fd
+        old_handler = signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        old_wakeup_fd = signal.set_wakeup_fd(write_fd, warn_on_full_buffer=False)
+        selector.register(read_fd, selectors.EVENT_READ, "sigchld")
+
+        def restore():
+            signal.set_wakeup_fd(old_wakeup_fd)
+            signal.signal(signal.SIGCHLD, old_handler)
+            selector.unregister(read_fd)
+            os.close(read_fd)
+            os.close(write_fd)
+
+        return restore
+
+    @staticmethod
+    def _drain(fd: int):
+        """Empty the wakeup pipe."""
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
@@ -0,0 +1,35 @@
+"""Shared test helpers."""
+
+from pathlib import Path
+
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+# Stand-in for recon-all: arguments are -i <nifti> -s <subject> -all
+FAKE_RECON_ALL = """#!/bin/sh
+mkdir -p "$SUBJECTS_DIR/$4/scripts"
+echo "OMP_NUM_THREADS=$OMP_NUM_THREADS"
+if [ "$4" = "slow" ]; then exec sleep 10; fi
+if [ "$4" = "bad" ]; then echo "recon-all failed" >&2; exit 1; fi
+touch "$SUBJECTS_DIR/$4/scripts/recon-all.done"
+"""
+
+
+def write_dicom(path: Path, modality: str):
+    """Write a minimal DICOM file with the given modality."""
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.4"
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = FileDataset(path, {}, file_meta=file_meta, preamble=b"\0" * 128)
+    ds.Modality = modality
+    ds.SeriesDescription = "T1w MPRAGE"
+    ds.save_as(path)
+
+
+def write_script(path: Path, body: str) -> str:
+    """Write an executable shell script standing in for an external tool."""
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return str(path)
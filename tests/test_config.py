@@ -0,0 +1,28 @@
+"""Unit tests for configuration helpers."""
+
+from src import config
+
+
+def test_config_values_are_cached(monkeypatch):
+    """Test that config values are read once until the cache is reset."""
+    monkeypatch.setenv("SUBJECTS_DIR", "/first")
+    config._reset_config_cache()
+    assert config.get_subjects_dir() == "/first"
+
+    monkeypatch.setenv("SUBJECTS_DIR", "/second")
+    assert config.get_subjects_dir() == "/first"
+
+    config._reset_config_cache()
+    assert config.get_subjects_dir() == "/second"
+    config._reset_config_cache()
+
+
+def test_database_url_uses_psycopg2(monkeypatch):
+    """Test the database URL names the installed psycopg2 driver explicitly."""
+    monkeypatch.setenv("POSTGRES_HOST", "db")
+    config._reset_config_cache()
+    url = config.get_database_url()
+    config._reset_config_cache()
+
+    assert url.startswith("postgresql+psycopg2://")
+    assert "@db:5432/" in url
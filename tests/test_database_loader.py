@@ -0,0 +1,90 @@
+"""Unit tests for database loader."""
+
+import pandas as pd
+import pytest
+
+from src.database.loader import VOLUMETRIC_METRIC_COLUMNS, DatabaseLoader
+from src.database.models import Scan, Subject, Volumetric
+
+
+@pytest.fixture
+def loader(tmp_path):
+    """Database loader backed by a temporary SQLite database."""
+    loader = DatabaseLoader(f"sqlite:///{tmp_path / 'test.db'}")
+    loader.create_tables()
+    return loader
+
+
+def test_volumetric_metric_columns():
+    """Test metric columns are derived from the Volumetric model."""
+    assert VOLUMETRIC_METRIC_COLUMNS == (
+        "icv",
+        "hippocampus_left",
+        "hippocampus_right",
+        "amygdala_left",
+        "amygdala_right",
+        "mean_thickness_lh",
+        "mean_thickness_rh",
+        "total_area_lh",
+        "total_area_rh",
+        "gray_volume_lh",
+        "gray_volume_rh",
+    )
+
+
+def test_load_metrics(loader):
+    """Test loading a single subject's metrics."""
+    metrics = {"subject_id": "sub-001", "icv": 1500000.0, "hippocampus_left": 4000.0}
+    volumetric_id = loader.load_metrics(
+        metrics, "sub-001", processing_runtime=12.5, nifti_path="/tmp/a.nii.gz"
+    )
+
+    session = loader.Session()
+    volumetric = session.get(Volumetric, volumetric_id)
+    assert volumetric.subject_id == "sub-001"
+    assert volumetric.icv == 1500000.0
+    assert volumetric.hippocampus_left == 4000.0
+    assert volumetric.amygdala_left is None
+    scan = session.get(Scan, volumetric.scan_id)
+    assert scan.processing_runtime_seconds == 12.5
+    assert scan.nifti_path == "/tmp/a.nii.gz"
+    session.close()
+
+
+def test_load_metrics_batch(loader):
+    """Test bulk loading metrics for several subjects."""
+    loader.load_metrics({"icv": 1.0}, "sub-001")
+
+    records = [
+        ("sub-001", {"icv": 2.0}, {"processing_status": "completed"}),
+        ("sub-002", {"icv": 3.0}, {}),
+        ("sub-002", {"icv": 4.0}, {}),
+    ]
+    volumetric_ids = loader.load_metrics_batch(records)
+
+    assert len(volumetric_ids) == 3
+    session = loader.Session()
+    assert session.query(Subject).count() == 2
+    assert session.query(Scan).count() == 4
+    icvs = [session.get(Volumetric, vid).icv for vid in volumetric_ids]
+    assert icvs == [2.0, 3.0, 4.0]
+    session.close()
+
+
+def test_bulk_copy_volumetrics_fallback(loader):
+    """Test bulk loading a DataFrame on a non-PostgreSQL database."""
+    metrics_df = pd.DataFrame(
+        [
+            {"subject_id": "sub-001", "icv": 1.0},
+            {"subject_id": "sub-002", "icv": 2.0, "hippocampus_left": 3.0},
+        ]
+    )
+    assert loader.bulk_copy_volumetrics(metrics_df) == 2
+
+    session = loader.Session()
+    assert session.query(Subject).count() == 2
+    volumetrics = session.query(Volumetric).order_by(Volumetric.id).all()
+    assert [v.icv for v in volumetrics] == [1.0, 2.0]
+    assert volumetrics[0].hippocampus_left is None
+    assert volumetrics[0].scan_id is None
+    session.close()
@@ -1,11 +1,12 @@
 """Unit tests for DICOM processor."""
 
+import asyncio
 import tempfile
 from pathlib import Path
 
 import pytest
-
 from src.ingestion.dicom_processor import DicomProcessor
+from tests.conftest import write_dicom, write_script
 
 
 def test_validate_modality_no_files():
@@ -17,7 +18,72 @@ def test_validate_modality_no_files():
         assert "No DICOM files found" in error_msg
 
 
+@pytest.mark.parametrize("name", ["missing", "file.txt"])
+def test_validate_modality_not_a_directory(tmp_path, name):
+    """Test validation of a missing path or a regular file."""
+    (tmp_path / "file.txt").write_text("")
+    is_valid, error_msg = DicomProcessor().validate_modality(tmp_path / name)
+
+    assert not is_valid
+    assert "No DICOM files found" in error_msg
+
+
+def test_validate_modality_nested_mr(tmp_path):
+    """Test validation finds MR files in nested series directories."""
+    series_dir = tmp_path / "series1"
+    series_dir.mkdir()
+    for i in range(3):
+        write_dicom(series_dir / f"img{i}.dcm", "MR")
+
+    processor = DicomProcessor()
+    is_valid, error_msg = processor.validate_modality(tmp_path)
+    assert is_valid
+    assert error_msg is None
+
+
+def test_validate_modality_wrong_modality(tmp_path):
+    """Test validation rejects non-MR DICOM files."""
+    write_dicom(tmp_path / "img0.dcm", "CT")
+
+    processor = DicomProcessor()
+    is_valid, error_msg = processor.validate_modality(tmp_path)
+    assert not is_valid
+    assert "Expected MR modality" in error_msg
+
+
 def test_dicom_processor_init():
     """Test DICOM processor initialization."""
     processor = DicomProcessor(dcm2niix_path="dcm2niix")
     assert processor.dcm2niix_path == "dcm2niix"
+
+
+def test_convert_to_nifti(tmp_path):
+    """Test conversion returns the NIfTI file written by dcm2niix."""
+    # Arguments: -o <output_dir> -f <output_filename> ...
+    fake = write_script(
+        tmp_path / "dcm2niix", 'echo "Converting"; touch "$2/$4.nii.gz"'
+    )
+    processor = DicomProcessor(dcm2niix_path=fake)
+
+    nifti_file = processor.convert_to_nifti(tmp_path, tmp_path / "out", "sub-001")
+    assert nifti_file == tmp_path / "out" / "sub-001_T1w.nii.gz"
+    assert nifti_file.exists()
+
+
+def test_convert_to_nifti_failure(tmp_path):
+    """Test conversion returns None when dcm2niix fails."""
+    fake = write_script(tmp_path / "dcm2niix", 'echo "bad input" >&2; exit 1')
+    processor = DicomProcessor(dcm2niix_path=fake)
+
+    assert processor.convert_to_nifti(tmp_path, tmp_path / "out", "sub-001") is None
+
+
+def test_convert_to_nifti_in_running_loop(tmp_path):
+    """Test the sync API works when called from inside an event loop."""
+    fake = write_script(tmp_path / "dcm2niix", 'touch "$2/$4.nii.gz"')
+    processor = DicomProcessor(dcm2niix_path=fake)
+
+    async def caller():
+        return processor.convert_to_nifti(tmp_path, tmp_path / "out", "sub-001")
+
+    assert asyncio.run(caller()) == tmp_path / "out" / "sub-001_T1w.nii.gz"
@@ -0,0 +1,389 @@
+"""Unit tests for FreeSurfer runner."""
+
+import os
+import shlex
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.processing import freesurfer_runner
+from src.processing.freesurfer_runner import BatchScheduler, FreeSurferRunner
+from tests.conftest import FAKE_RECON_ALL
+
+CHECK_DOCKER_STORAGE_DRIVER = freesurfer_runner._check_docker_storage_driver
+
+
+@pytest.fixture(autouse=True)
+def no_docker_info(monkeypatch):
+    """Skip the Docker storage driver check."""
+    monkeypatch.setattr(freesurfer_runner, "_check_docker_storage_driver", lambda: None)
+
+
+@pytest.fixture
+def runner(tmp_path):
+    """FreeSurfer runner using a fake native recon-all."""
+    freesurfer_home = tmp_path / "freesurfer"
+    (freesurfer_home / "bin").mkdir(parents=True)
+    recon_all = freesurfer_home / "bin" / "recon-all"
+    recon_all.write_text(FAKE_RECON_ALL)
+    recon_all.chmod(0o755)
+
+    subjects_dir = tmp_path / "subjects"
+    subjects_dir.mkdir()
+    return FreeSurferRunner(
+        freesurfer_home=str(freesurfer_home), subjects_dir=str(subjects_dir)
+    )
+
+
+@pytest.fixture
+def docker_commands(monkeypatch):
+    """Record Docker commands instead of running them."""
+    commands = []
+
+    def execute_recon_all(self, cmd, subject_id, *args, **kwargs):
+        commands.append(cmd)
+        return {"subject_id": subject_id, "status": "completed"}
+
+    monkeypatch.setattr(FreeSurferRunner, "_execute_recon_all", execute_recon_all)
+    monkeypatch.setattr(
+        freesurfer_runner.subprocess,
+        "run",
+        lambda cmd, **kwargs: commands.append(cmd)
+        or subprocess.CompletedProcess(cmd, 0, stdout="abc123\n", stderr=""),
+    )
+    return commands
+
+
+def test_run_recon_all_native(runner, tmp_path):
+    """Test a successful native recon-all run."""
+    result = runner.run_recon_all(
+        tmp_path / "sub-001_T1w.nii.gz", "sub-001", use_docker=False
+    )
+
+    assert result["status"] == "completed"
+    assert result["output_dir"] == str(Path(runner.subjects_dir) / "sub-001")
+    assert Path(result["log_file"]).read_text() == result["stdout"]
+
+
+def test_tail(tmp_path):
+    """Test reading only the end of a log file."""
+    log_file = tmp_path / "recon-all.log"
+    log_file.write_bytes(b"x" * 5000 + b"y" * 1000)
+
+    assert freesurfer_runner._tail(log_file) == "y" * 1000
+    assert freesurfer_runner._tail(tmp_path / "missing.log") is None
+
+
+def test_run_recon_all_native_failure(runner, tmp_path):
+    """Test a failing native recon-all run."""
+    result = runner.run_recon_all(tmp_path / "bad_T1w.nii.gz", "bad", use_docker=False)
+
+    assert result["status"] == "failed"
+    assert "recon-all failed" in result["stderr"]
+
+
+def test_run_recon_all_already_completed(runner, tmp_path):
+    """Test completed subjects are skipped unless forced."""
+    nifti_file = tmp_path / "sub-001_T1w.nii.gz"
+    runner.run_recon_all(nifti_file, "sub-001", use_docker=False)
+
+    result = runner.run_recon_all(nifti_file, "sub-001", use_docker=False)
+    assert result["status"] == "already_completed"
+    assert result["output_dir"] == str(Path(runner.subjects_dir) / "sub-001")
+
+    result = runner.run_recon_all(nifti_file, "sub-001", use_docker=False, force=True)
+    assert result["status"] == "completed"
+
+    results = runner.run_recon_all_batch(
+        [(nifti_file, "sub-001"), (tmp_path / "sub-002_T1w.nii.gz", "sub-002")],
+        use_docker=False,
+    )
+    assert [r["status"] for r in results] == ["already_completed", "completed"]
+    assert results[0]["subject_id"] == "sub-001"
+
+
+def test_run_recon_all_native_failure_stale_marker(runner, tmp_path, caplog):
+    """Test a failing run is reported failed despite a leftover done marker."""
+    scripts_dir = Path(runner.subjects_dir) / "bad" / "scripts"
+    scripts_dir.mkdir(parents=True)
+    (scripts_dir / "recon-all.done").touch()
+
+    result = runner.run_recon_all(
+        tmp_path / "bad_T1w.nii.gz", "bad", use_docker=False, force=True
+    )
+
+    assert result["status"] == "failed"
+    assert "recon-all.done marker" in caplog.text
+
+
+@pytest.mark.parametrize("wakeup", ["pidfd", "sigchld", "threads"])
+def test_run_recon_all_batch(monkeypatch, runner, tmp_path, wakeup):
+    """Test running recon-all for several subjects concurrently."""
+    if wakeup != "pidfd":
+        monkeypatch.setattr(
+            BatchScheduler, "_pidfd_supported", staticmethod(lambda: False)
+        )
+    if wakeup == "threads":
+        monkeypatch.setattr(BatchScheduler, "available", staticmethod(lambda: False))
+
+    subjects = [
+        (tmp_path / f"{sid}_T1w.nii.gz", sid) for sid in ("sub-001", "bad", "sub-002")
+    ]
+    results = runner.run_recon_all_batch(subjects, max_parallel=2, use_docker=False)
+
+    assert [r["subject_id"] for r in results] == ["sub-001", "bad", "sub-002"]
+    assert [r["status"] for r in results] == ["completed", "failed", "completed"]
+    assert "OMP_NUM_THREADS=1" in results[0]["stdout"]
+
+
+@pytest.mark.parametrize("use_pidfd", [True, False])
+def test_wait_for_exit(monkeypatch, use_pidfd):
+    """Test waiting for child exit with and without pidfd support."""
+    if not use_pidfd:
+        monkeypatch.delattr(os, "pidfd_open", raising=False)
+
+    proc = subprocess.Popen(["sleep", "0"])
+    assert freesurfer_runner._wait_for_exit(proc, timeout=10)
+    assert proc.returncode == 0
+
+    proc = subprocess.Popen(["sleep", "10"])
+    assert not freesurfer_runner._wait_for_exit(proc, timeout=0.1)
+    assert proc.returncode is not None
+
+
+@pytest.mark.parametrize(
+    "storage, mount_flag, subjects_dir",
+    [
+        ("bind", None, "/output"),
+        ("volume", "--mount", "/work"),
+        ("tmpfs", "--tmpfs", "/work"),
+    ],
+)
+def test_docker_work_storage(
+    docker_commands, tmp_path, storage, mount_flag, subjects_dir
+):
+    """Test Docker command construction for each work storage option."""
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path), docker_work_storage=storage)
+
+    runner.run_recon_all(tmp_path / "sub-001_T1w.nii.gz", "sub-001")
+
+    cmd = docker_commands[0]
+    assert f"SUBJECTS_DIR={subjects_dir}" in cmd
+    assert cmd[-6:] == [
+        "recon-all",
+        "-i",
+        "/input/sub-001_T1w.nii.gz",
+        "-s",
+        "sub-001",
+        "-all",
+    ]
+    assert cmd[cmd.index("--name") + 1] == "fs_recon_sub-001"
+    if mount_flag:
+        assert mount_flag in cmd
+    if storage == "volume":
+        assert docker_commands[1] == ["docker", "volume", "rm", "-f", "fs_work_sub-001"]
+    else:
+        assert len(docker_commands) == 1
+
+
+@pytest.mark.parametrize(
+    "input_options, output_options, output_mount",
+    [("ro", "", "/output"), ("ro,cached", "delegated", "/output:delegated")],
+)
+def test_docker_mount_options(
+    monkeypatch, docker_commands, tmp_path, input_options, output_options, output_mount
+):
+    """Test bind mount options, which are only set on macOS."""
+    monkeypatch.setattr(freesurfer_runner, "INPUT_MOUNT_OPTIONS", input_options)
+    monkeypatch.setattr(freesurfer_runner, "OUTPUT_MOUNT_OPTIONS", output_options)
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path), docker_work_storage="bind")
+
+    runner.run_recon_all(tmp_path / "sub-001_T1w.nii.gz", "sub-001")
+
+    assert f"{tmp_path}:{output_mount}" in docker_commands[0]
+    assert f"{tmp_path}:/input:{input_options}" in docker_commands[0]
+
+
+def test_docker_timeout_removes_container(monkeypatch, caplog, tmp_path):
+    """Test a timed-out run's container is removed before its work volume."""
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path))
+    monkeypatch.setattr(
+        runner,
+        "_execute_recon_all",
+        lambda cmd, subject_id, *args: {"subject_id": subject_id, "status": "timeout"},
+    )
+    commands = []
+    monkeypatch.setattr(
+        freesurfer_runner.subprocess,
+        "run",
+        lambda cmd, **kwargs: commands.append(cmd)
+        or subprocess.CompletedProcess(cmd, 1, stderr="volume is in use"),
+    )
+
+    result = runner.run_recon_all(tmp_path / "sub 001_T1w.nii.gz", "sub 001")
+
+    assert result["status"] == "timeout"
+    assert commands == [
+        ["docker", "rm", "-f", "fs_recon_sub_001"],
+        ["docker", "volume", "rm", "-f", "fs_work_sub_001"],
+    ]
+    assert "volume is in use" in caplog.text
+
+
+@pytest.mark.parametrize("allow_io_uring", [True, False])
+def test_docker_allow_io_uring(docker_commands, tmp_path, allow_io_uring):
+    """Test the seccomp opt-out is only added when io_uring is allowed."""
+    runner = FreeSurferRunner(
+        subjects_dir=str(tmp_path),
+        docker_work_storage="bind",
+        allow_io_uring=allow_io_uring,
+    )
+
+    runner.run_recon_all(tmp_path / "sub-001_T1w.nii.gz", "sub-001")
+
+    assert ("seccomp=unconfined" in docker_commands[0]) == allow_io_uring
+
+
+def test_docker_work_storage_invalid():
+    """Test that an unknown work storage option is rejected."""
+    with pytest.raises(ValueError):
+        FreeSurferRunner(docker_work_storage="nfs")
+
+
+def test_docker_session(docker_commands, tmp_path):
+    """Test recon-all runs exec into one long-lived container."""
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path / "subjects"))
+
+    with runner.docker_session(tmp_path) as session:
+        session.run_recon_all(tmp_path / "sub-001" / "T1w.nii.gz", "sub-001")
+        with pytest.raises(ValueError):
+            session.run_recon_all(Path("/elsewhere/T1w.nii.gz"), "sub-002")
+
+    start, exec_cmd, remove, remove_volume = docker_commands
+    assert start[:5] == ["docker", "run", "-d", "--name", "fs_pool"]
+    assert start[-2:] == ["sleep", "infinity"]
+    assert exec_cmd[:2] == ["docker", "exec"]
+    assert "abc123" in exec_cmd
+    assert "/input/sub-001/T1w.nii.gz" in exec_cmd
+    assert "rm -rf /work/sub-001" in exec_cmd[exec_cmd.index("-c") + 1]
+    assert remove == ["docker", "rm", "-f", "abc123"]
+    assert remove_volume == ["docker", "volume", "rm", "-f", "fs_work_fs_pool"]
+    assert runner._container_id is None
+
+
+@pytest.mark.parametrize("driver, warned", [("aufs", True), ("overlay2", False)])
+def test_check_docker_storage_driver(monkeypatch, caplog, driver, warned):
+    """Test warning when Docker runs on the AUFS storage driver."""
+    check = CHECK_DOCKER_STORAGE_DRIVER
+    check.cache_clear()
+    monkeypatch.setattr(
+        freesurfer_runner.subprocess,
+        "run",
+        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, stdout=driver),
+    )
+
+    assert check() == driver
+    assert ("overlay2" in caplog.text) == warned
+    check.cache_clear()
+
+
+def test_docker_resolves_input_dir(docker_commands, tmp_path):
+    """Test a str input path under a symlinked directory is mounted resolved."""
+    (tmp_path / "real").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "real")
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path), docker_work_storage="bind")
+
+    runner.run_recon_all(str(tmp_path / "link" / "sub-001_T1w.nii.gz"), "sub-001")
+
+    assert f"{tmp_path / 'real'}:/input:ro" in docker_commands[0]
+    assert "/input/sub-001_T1w.nii.gz" in docker_commands[0]
+
+
+def test_docker_resolves_symlinked_input(docker_commands, tmp_path):
+    """Test a symlinked NIfTI is mounted from its target's directory."""
+    (tmp_path / "annex").mkdir()
+    (tmp_path / "annex" / "MD5E-s1--abc.nii.gz").touch()
+    (tmp_path / "dataset").mkdir()
+    (tmp_path / "dataset" / "sub-001_T1w.nii.gz").symlink_to(
+        tmp_path / "annex" / "MD5E-s1--abc.nii.gz"
+    )
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path), docker_work_storage="bind")
+
+    runner.run_recon_all(tmp_path / "dataset" / "sub-001_T1w.nii.gz", "sub-001")
+
+    assert f"{tmp_path / 'annex'}:/input:ro" in docker_commands[0]
+    assert "/input/MD5E-s1--abc.nii.gz" in docker_commands[0]
+
+
+def test_batch_scheduler_timeout(monkeypatch, runner, tmp_path):
+    """Test the scheduler kills runs past the timeout and keeps going."""
+    monkeypatch.setattr(freesurfer_runner, "RECON_ALL_TIMEOUT", 0.5)
+    scheduler = BatchScheduler(runner, max_parallel=1, use_docker=False)
+
+    results = scheduler.run(
+        [(tmp_path / f"{sid}_T1w.nii.gz", sid) for sid in ("slow", "sub-001")]
+    )
+
+    assert [r["status"] for r in results] == ["timeout", "completed"]
+
+
+def test_native_env_cached(monkeypatch, runner, tmp_path):
+    """Test the native environment is reused until refresh_env()."""
+    _, env = runner._native_command(tmp_path / "T1w.nii.gz", "sub-001", 2)
+    monkeypatch.setenv("FS_TEST_VAR", "1")
+
+    _, cached = runner._native_command(tmp_path / "T1w.nii.gz", "sub-002", 2)
+    assert cached is env
+    assert "FS_TEST_VAR" not in cached
+
+    runner.refresh_env()
+    _, refreshed = runner._native_command(tmp_path / "T1w.nii.gz", "sub-002", 2)
+    assert refreshed["FS_TEST_VAR"] == "1"
+    assert refreshed["OMP_NUM_THREADS"] == "2"
+
+
+@pytest.mark.parametrize("storage", ["bind", "volume"])
+def test_docker_script_quotes_subject_id(tmp_path, storage):
+    """Test subject IDs with spaces or shell metacharacters stay one word."""
+    runner = FreeSurferRunner(subjects_dir=str(tmp_path), docker_work_storage=storage)
+    _, script = runner._docker_script("sub 01;touch PWNED", cleanup=True)
+
+    words = shlex.split(script)
+    assert "/output/sub 01;touch PWNED.recon-all.log" in words
+    assert "touch" not in words
+
+
+@pytest.mark.parametrize("failure", ["log_file", "pidfd", "threads"])
+def test_run_recon_all_batch_launch_failure(monkeypatch, runner, tmp_path, failure):
+    """Test a subject that fails to start does not stop the others."""
+    if failure == "pidfd":
+        if not BatchScheduler._pidfd_supported():
+            pytest.skip("pidfd_open not supported")
+        pidfd_open = os.pidfd_open
+        calls = []
+
+        def flaky_pidfd_open(pid, *args):
+            calls.append(pid)
+            if len(calls) == 2:
+                raise OSError(24, "Too many open files")
+            return pidfd_open(pid, *args)
+
+        monkeypatch.setattr(freesurfer_runner.os, "pidfd_open", flaky_pidfd_open)
+    else:
+        Path(runner.subjects_dir, "broken.recon-all.log").mkdir()
+    if failure == "threads":
+        monkeypatch.setattr(BatchScheduler, "available", staticmethod(lambda: False))
+
+    results = runner.run_recon_all_batch(
+        [
+            (tmp_path / f"{sid}_T1w.nii.gz", sid)
+            for sid in ("sub-001", "broken", "sub-002")
+        ],
+        max_parallel=2,
+        use_docker=False,
+    )
+
+    assert [r["status"] for r in results] == ["completed", "failed", "completed"]
+    assert results[1]["subject_id"] == "broken"
+    assert results[1]["stderr"]
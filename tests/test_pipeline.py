@@ -0,0 +1,161 @@
+"""Unit tests for pipeline orchestration."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.database.models import Scan, Volumetric
+from src.pipeline import Pipeline
+from tests.conftest import FAKE_RECON_ALL, write_dicom, write_script
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """Pipeline using fake dcm2niix and native recon-all and a SQLite database."""
+    freesurfer_home = tmp_path / "freesurfer"
+    (freesurfer_home / "bin").mkdir(parents=True)
+    write_script(freesurfer_home / "bin" / "recon-all", FAKE_RECON_ALL)
+
+    subjects_dir = tmp_path / "subjects"
+    subjects_dir.mkdir()
+    pipeline = Pipeline(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        subjects_dir=str(subjects_dir),
+        freesurfer_home=str(freesurfer_home),
+        use_docker=False,
+    )
+    pipeline.db_loader.create_tables()
+    # Arguments: -o <output_dir> -f <output_filename> ...
+    pipeline.dicom_processor.dcm2niix_path = write_script(
+        tmp_path / "dcm2niix", 'touch "$2/$4.nii.gz"'
+    )
+    return pipeline
+
+
+def test_run_many(monkeypatch, pipeline, tmp_path):
+    """Test per-subject failures are reported and successes loaded in one batch."""
+    for subject_id in ("sub-001", "boom"):
+        (tmp_path / subject_id).mkdir()
+        write_dicom(tmp_path / subject_id / "img0.dcm", "MR")
+
+    run_recon_all = pipeline.freesurfer_runner.run_recon_all
+
+    def fake_run_recon_all(nifti_file, subject_id, **kwargs):
+        if subject_id == "boom":
+            raise OSError("recon-all not found")
+        return run_recon_all(nifti_file, subject_id, **kwargs)
+
+    monkeypatch.setattr(pipeline.freesurfer_runner, "run_recon_all", fake_run_recon_all)
+
+    batches = []
+    load_metrics_batch = pipeline.db_loader.load_metrics_batch
+    monkeypatch.setattr(
+        pipeline.db_loader,
+        "load_metrics_batch",
+        lambda records: batches.append(records) or load_metrics_batch(records),
+    )
+
+    results = asyncio.run(
+        pipeline.run_many(
+            [
+                (tmp_path / "sub-001", "sub-001"),
+                (tmp_path / "missing", "sub-002"),
+                (tmp_path / "boom", "boom"),
+            ],
+            output_dir=tmp_path / "nifti",
+        )
+    )
+
+    assert [r["status"] for r in results] == ["completed", "failed", "failed"]
+    assert "No DICOM files found" in results[1]["errors"][0]
+    assert "recon-all not found" in results[2]["errors"][0]
+    assert [[r[0] for r in batch] for batch in batches] == [["sub-001"]]
+
+    session = pipeline.db_loader.Session()
+    assert session.query(Volumetric).count() == 1
+    assert session.query(Scan).one().processing_status == "completed"
+    session.close()
+
+
+def test_run_many_rerun_completed_subject(pipeline, tmp_path):
+    """Test reruns of finished subjects neither reload nor record a runtime."""
+    for subject_id in ("sub-001", "sub-002"):
+        (tmp_path / subject_id).mkdir()
+        write_dicom(tmp_path / subject_id / "img0.dcm", "MR")
+    jobs = [(tmp_path / sid, sid) for sid in ("sub-001", "sub-002")]
+
+    # sub-002 finished recon-all earlier but its metrics were never loaded
+    scripts_dir = tmp_path / "subjects" / "sub-002" / "scripts"
+    scripts_dir.mkdir(parents=True)
+    (scripts_dir / "recon-all.done").touch()
+
+    first = asyncio.run(pipeline.run_many(jobs, output_dir=tmp_path / "nifti"))
+    second = asyncio.run(pipeline.run_many(jobs, output_dir=tmp_path / "nifti"))
+
+    assert [r["status"] for r in first] == ["completed", "completed"]
+    assert [r["status"] for r in second] == ["already_completed"] * 2
+
+    session = pipeline.db_loader.Session()
+    assert session.query(Volumetric).count() == 2
+    runtimes = dict(session.query(Scan.subject_id, Scan.processing_runtime_seconds))
+    session.close()
+    assert runtimes["sub-001"] > 0
+    assert runtimes["sub-002"] is None
+
+
+def test_run_rerun_completed_subject(pipeline, tmp_path):
+    """Test a single-subject rerun does not insert duplicate rows."""
+    (tmp_path / "sub-001").mkdir()
+    write_dicom(tmp_path / "sub-001" / "img0.dcm", "MR")
+
+    first = pipeline.run(tmp_path / "sub-001", "sub-001", tmp_path / "nifti")
+    second = pipeline.run(tmp_path / "sub-001", "sub-001", tmp_path / "nifti")
+
+    assert first["status"] == "completed"
+    assert second["status"] == "already_completed"
+    session = pipeline.db_loader.Session()
+    assert session.query(Volumetric).count() == 1
+    session.close()
+
+
+def test_run_rerun_database_error(monkeypatch, pipeline, tmp_path):
+    """Test a database error while checking a rerun is reported, not raised."""
+    (tmp_path / "sub-001").mkdir()
+    write_dicom(tmp_path / "sub-001" / "img0.dcm", "MR")
+    pipeline.run(tmp_path / "sub-001", "sub-001", tmp_path / "nifti")
+
+    def fail(subject_ids):
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setattr(pipeline.db_loader, "subjects_with_volumetrics", fail)
+    results = pipeline.run(tmp_path / "sub-001", "sub-001", tmp_path / "nifti")
+
+    assert results["status"] == "failed"
+    assert "Database loading failed: connection refused" in results["errors"]
+
+
+def test_run_many_extracts_metrics_off_loop(monkeypatch, pipeline, tmp_path):
+    """Test stats parsing runs in a worker thread, not on the event loop."""
+    (tmp_path / "sub-001").mkdir()
+    write_dicom(tmp_path / "sub-001" / "img0.dcm", "MR")
+
+    threads = []
+    extract_all_metrics = pipeline.stats_parser.extract_all_metrics
+
+    def record_thread(subject_id):
+        threads.append(threading.get_ident())
+        return extract_all_metrics(subject_id)
+
+    monkeypatch.setattr(pipeline.stats_parser, "extract_all_metrics", record_thread)
+
+    async def run():
+        results = await pipeline.run_many(
+            [(tmp_path / "sub-001", "sub-001")], output_dir=tmp_path / "nifti"
+        )
+        return results, threading.get_ident()
+
+    results, loop_thread = asyncio.run(run())
+
+    assert results[0]["status"] == "completed"
+    assert threads and loop_thread not in threads
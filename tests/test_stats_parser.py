@@ -78,6 +78,46 @@ def test_parse_aseg_stats(temp_subjects_dir):
     assert "amygdala_right" in metrics
 
 
+def test_parse_aseg_stats_values(temp_subjects_dir):
+    """Test that structure volumes come from the Volume_mm3 column."""
+    parser = StatsParser(str(temp_subjects_dir))
+    metrics = parser.parse_aseg_stats("test_subject")
+
+    assert metrics["hippocampus_left"] == 3456789.01
+    assert metrics["amygdala_left"] == 4567890.12
+    assert metrics["hippocampus_right"] == 5678901.23
+    assert metrics["amygdala_right"] == 6789012.34
+
+
+def test_parse_aseg_stats_column_order(temp_subjects_dir):
+    """Test that table columns are located from the ColHeaders line."""
+    (temp_subjects_dir / "test_subject" / "stats" / "aseg.stats").write_text(
+        "# ColHeaders  StructName Volume_mm3\n"
+        "  Left-Hippocampus 4000.5\n"
+        "  Right-Amygdala 1500.25\n"
+    )
+    parser = StatsParser(str(temp_subjects_dir))
+    metrics = parser.parse_aseg_stats("test_subject")
+
+    assert metrics == {"hippocampus_left": 4000.5, "amygdala_right": 1500.25}
+
+
+def test_parse_aseg_stats_empty_file(temp_subjects_dir):
+    """Test parsing an empty aseg.stats file."""
+    (temp_subjects_dir / "test_subject" / "stats" / "aseg.stats").write_text("")
+    parser = StatsParser(str(temp_subjects_dir))
+
+    assert parser.parse_aseg_stats("test_subject") == {}
+
+
+def test_parse_stats_missing_subject(temp_subjects_dir):
+    """Test parsing a subject without stats files."""
+    parser = StatsParser(str(temp_subjects_dir))
+
+    assert parser.parse_aseg_stats("missing_subject") == {}
+    assert parser.parse_aparc_stats("missing_subject") == {}
+
+
 def test_parse_aparc_stats(temp_subjects_dir):
     """Test parsing aparc.stats files."""
     parser = StatsParser(str(temp_subjects_dir))
@@ -93,14 +133,49 @@ def test_parse_aparc_stats(temp_subjects_dir):
 
 
 def test_extract_all_metrics(temp_subjects_dir):
-    """Test extracting all metrics as DataFrame."""
+    """Test extracting all metrics as a dictionary."""
+    parser = StatsParser(str(temp_subjects_dir))
+    metrics = parser.extract_all_metrics("test_subject")
+
+    assert isinstance(metrics, dict)
+    assert metrics["subject_id"] == "test_subject"
+    assert "icv" in metrics
+    assert "hippocampus_left" in metrics
+    assert "mean_thickness_rh" in metrics
+
+
+def test_to_dataframe(temp_subjects_dir):
+    """Test converting extracted metrics to a DataFrame."""
     import pandas as pd
 
     parser = StatsParser(str(temp_subjects_dir))
-    df = parser.extract_all_metrics("test_subject")
+    df = parser.to_dataframe([parser.extract_all_metrics("test_subject")])
 
     assert isinstance(df, pd.DataFrame)
     assert len(df) == 1
     assert df.iloc[0]["subject_id"] == "test_subject"
     assert "icv" in df.columns
     assert "hippocampus_left" in df.columns
+
+
+def test_extract_all_metrics_batch(temp_subjects_dir):
+    """Test extracting a cohort into one DataFrame concurrently."""
+    parser = StatsParser(str(temp_subjects_dir))
+    df = parser.extract_all_metrics_batch(
+        ["test_subject", "missing_subject", "test_subject"], max_workers=2
+    )
+
+    assert list(df["subject_id"]) == ["test_subject", "missing_subject", "test_subject"]
+    assert df.loc[0, "icv"] == df.loc[2, "icv"]
+
+
+def test_to_dataframe_cohort(temp_subjects_dir):
+    """Test building one DataFrame for a cohort from a generator."""
+    parser = StatsParser(str(temp_subjects_dir))
+    df = parser.to_dataframe(
+        parser.extract_all_metrics(s) for s in ("test_subject", "missing_subject")
+    )
+
+    assert list(df["subject_id"]) == ["test_subject", "missing_subject"]
+    assert df.columns[0] == "subject_id"
+    assert df["icv"].isna().tolist() == [False, True]